@@ -21,14 +21,7 @@ async def is_owner(request: Request):
     """Check if the authenticated user is the bot owner"""
     backend: APIServer = request.app.state.backend
     try:
-        access_token = await backend.verify_auth(request)
-        if access_token is None:
-            raise HTTPException(status_code=401, detail="Access token is missing")
-        session =  backend.oauth_sessions[access_token]
-        
-        # Get user from OAuth session
-        user = await session.fetch_user()
-        user_id = int(user["id"])
+        user_id = (await backend.resolve_auth(request)).user_id
         
         # Check if user is owner
         is_owner = user_id == overwriteOwner or user_id ==  backend.client.owner_id
@@ -108,14 +101,8 @@ async def get_admin_guilds(request: Request):
     """Get summary of all guilds for admin"""
     backend: APIServer = request.app.state.backend
     try:
-        access_token = await backend.verify_auth(request)
-        if access_token is None:
-            raise HTTPException(status_code=401, detail="Access token is missing")
-        session = backend.oauth_sessions[access_token]
-        
-        # Get user data and verify owner status
-        user = await session.fetch_user()
-        user_id = int(user["id"])
+        # Verify owner status
+        user_id = (await backend.resolve_auth(request)).user_id
         if user_id != overwriteOwner and user_id != backend.client.owner_id:
             raise HTTPException(status_code=403, detail="Not authorized")
             
@@ -1,12 +1,12 @@
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse, RedirectResponse
-from backend.features.cache import get_cached_guilds, get_cached_user
 from modules.DiscordConfig import overwriteOwner, config
 from typing import TYPE_CHECKING, Optional
 
 from nexon.data.models import UserBadge, Badge
 from .baseModels import *
+from backend.features.security import AuthContext
 import time
 from nexon.OAuth2 import OAuth2Client, OAuth2Session, OAuth2Token
 from nexon.types.oauth2 import Guild, OAuth2Scope, User
@@ -24,14 +24,7 @@ async def check_owner(request: Request):
     """Check if the user is the bot owner"""
     backend: APIServer = request.app.state.backend
     try:
-        access_token = await backend.verify_auth(request)
-        if access_token is None:
-            raise HTTPException(status_code=401, detail="Access token is missing")
-        session = backend.oauth_sessions[access_token]
-
-        # Get user data from OAuth session
-        user = await session.fetch_user()
-        user_id = int(user["id"])
+        user_id = (await backend.resolve_auth(request)).user_id
 
         if user_id != overwriteOwner and user_id != backend.client.owner_id:
             raise HTTPException(status_code=403, detail="Not authorized")
@@ -60,11 +53,22 @@ async def discord_callback(request: Request, data: DiscordCallbackRequest):
         user = await session.fetch_user()
 
         # Cache session and user data
-        backend.oauth_sessions[token.access_token] = session
+        backend.oauth_sessions.put(token.access_token, session, token)
 
-        response_data = {"user": user, "accessToken": token.access_token}
+        # Signed session token so later requests skip Discord until it expires
+        session_token = backend.issue_session_token(
+            AuthContext(access_token=token.access_token, user=user)
+        )
 
-        return JSONResponse(response_data)
+        response_data = {
+            "user": user,
+            "accessToken": token.access_token,
+            "sessionToken": session_token,
+        }
+
+        response = JSONResponse(response_data)
+        backend.set_session_cookie(response, session_token)
+        return response
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -75,8 +79,7 @@ async def get_user(request: Request):
     """Get authenticated user data"""
     backend: APIServer = request.app.state.backend
     try:
-        access_token = await backend.verify_auth(request)
-        user = await get_cached_user(backend, access_token)
+        user = (await backend.resolve_auth(request)).user
         return {"user": user}
 
     except HTTPException as e:
@@ -90,15 +93,10 @@ async def get_user_dashboard(request: Request):
     """Get comprehensive user dashboard information"""
     backend: APIServer = request.app.state.backend
     try:
-        access_token = await backend.verify_auth(request)
-        
-        if access_token is None:
-            raise HTTPException(status_code=401, detail="Access token is missing")
-        
-        user = await get_cached_user(backend, access_token)
+        user = (await backend.resolve_auth(request)).user
 
         # Get guilds
-        guilds = await get_cached_guilds(backend, access_token)
+        guilds = await backend.resolve_guilds(request)
         admin_guilds = [g for g in guilds if (int(g["permissions"]) & 0x8) == 0x8]
 
         # Get user data from bot
@@ -182,13 +180,7 @@ async def get_user_guilds(request: Request):
     """Get user's guilds where the user is an admin"""
     backend: APIServer = request.app.state.backend
     try:
-        access_token = await backend.verify_auth(request)
-        if access_token is None:
-            raise HTTPException(status_code=401, detail="Access token is missing")
-        session = backend.oauth_sessions[access_token]
-
-        # Get guilds from OAuth session
-        guilds = await session.fetch_guilds()
+        guilds = await backend.resolve_guilds(request)
 
         # Filter guilds where the user is an admin
         admin_guilds = [
@@ -239,12 +231,13 @@ async def logout(request: Request):
                 status_code=401, content={"detail": "Not authenticated"}
             )
 
-        session = backend.oauth_sessions.get(access_token)
+        session = backend.oauth_sessions.pop(access_token, None)
         if session:
             await session.revoke()
 
         response = JSONResponse({"success": True})
         response.delete_cookie("accessToken")
+        response.delete_cookie("sessionToken")
         response.delete_cookie("user_id")
         return response
 
@@ -322,23 +322,19 @@ async def upload_welcome_background(request: Request, file: UploadFile = File(..
 async def get_command_stats(request: Request):
     """Get command usage statistics"""
     backend: APIServer = request.app.state.backend
-    stats = {}
-
-    # Get all users' command usage data
     from nexon.data.models import UserData
 
-    users = await UserData.all()
-
-    # Aggregate command usage across all users
-    for user in users:
-        for cmd, count in user.favorites_commands.items():
-            if cmd not in stats:
-                stats[cmd] = 0
-            stats[cmd] += count
+    # Read from the materialized counters; users' history is only walked
+    # once, to backfill them
+    usage = await backend.command_usage.command_stats(
+        lambda: UserData.all().values_list("favorites_commands", "last_command_use")
+    )
 
-            # Add timestamp of last use if available
-            if user.last_command_use and user.last_command_use.get(cmd):
-                stats[f"{cmd}_last_used"] = user.last_command_use[cmd]
+    stats = {}
+    for cmd, (count, last_used) in usage.items():
+        stats[cmd] = count
+        if last_used:
+            stats[f"{cmd}_last_used"] = last_used
 
     return stats
 
@@ -356,25 +352,12 @@ async def track_command_usage(request: Request):
         raise HTTPException(status_code=400, detail="Missing command or user_id")
 
     try:
-        from nexon.data.models import UserData
-
-        user = await UserData.get(id=user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # Update command usage
-        if not hasattr(user, "favorites_commands"):
-            user.favorites_commands = {}
-        if not hasattr(user, "last_command_use"):
-            user.last_command_use = {}
-
-        user.favorites_commands[command_name] = (
-            user.favorites_commands.get(command_name, 0) + 1
-        )
-        user.last_command_use[command_name] = utils.utcnow().timestamp()
-
-        await user.save()
-        return {"success": True}
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid user_id")
+
+    # Only the user's own history is updated here, in batches: the global
+    # counters are fed by every command completion, so counting this call
+    # would do it twice
+    backend.command_usage.track_user(user_id, command_name)
+    return {"success": True}
@@ -15,6 +15,7 @@ from .baseModels import *
 from .layout import pages
 from nexon import Feature
 from nexon.data.models import MemberData
+from tortoise.functions import Count, Sum
 from pydantic import BaseModel, Field
 from typing import List, Union
 from nexon import Logs
@@ -32,17 +33,8 @@ router = APIRouter(tags=["guilds"])
 async def get_user(request: Request, guild_id: Optional[int] = None) -> User:
     """Retrieve the authenticated user from the request and check if they are an admin of a specific guild"""
     backend: APIServer = request.app.state.backend
-    access_token = await backend.verify_auth(request)
-    if not access_token:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-
-    # Use cached user data
-    cached_user = await backend.cache.get_cached_user(access_token)
-    if cached_user:
-        user = User(**cached_user)  # Convert cached data to User object
-    else:
-        session = backend.oauth_sessions[access_token]
-        user = await session.fetch_user()
+    # Resolved once per request and shared with the route handler
+    user = (await backend.resolve_auth(request)).user
 
     if guild_id is not None:
         guild = await backend.fetch_guild(guild_id)
@@ -124,33 +116,42 @@ async def get_guild(guild_id: int, request: Request):
         "owner_id": guild.owner_id,
     }
 
-    # Fetch member statistics from the database
-
-    members_data = await MemberData.filter(guild_id=guild_id)
-
-    total_messages = sum(member.total_messages for member in members_data)
-    total_commands = sum(member.commands_used_count for member in members_data)
-    total_chars = sum(member.character_count for member in members_data)
-    total_attachments = sum(member.attachment_count for member in members_data)
-
-    # Get command usage breakdown
-    command_usage = {}
-    for member in members_data:
-        for cmd, count in member.favorites_commands.items():
-            command_usage[cmd] = command_usage.get(cmd, 0) + count
+    # Member statistics are summed by the database; only the totals come back
+    totals = (
+        await MemberData.filter(guild_id=guild_id)
+        .annotate(
+            messages=Sum("total_messages"),
+            commands=Sum("commands_used_count"),
+            characters=Sum("character_count"),
+            attachments=Sum("attachment_count"),
+            members=Count("guild_id"),
+        )
+        .first()
+        .values("messages", "commands", "characters", "attachments", "members")
+    ) or {}
+    total_messages = totals.get("messages") or 0
+    active_members = totals.get("members") or 0
+
+    # Command usage breakdown from the pre-aggregated counters
+    command_usage = await backend.command_usage.guild_usage(
+        guild_id,
+        lambda: MemberData.filter(guild_id=guild_id).values_list(
+            "favorites_commands", flat=True
+        ),
+    )
 
     # Add statistics to response
     guild_data.update(
         {
             "statistics": {
                 "total_messages": total_messages,
-                "total_commands_used": total_commands,
-                "total_characters": total_chars,
-                "total_attachments": total_attachments,
+                "total_commands_used": totals.get("commands") or 0,
+                "total_characters": totals.get("characters") or 0,
+                "total_attachments": totals.get("attachments") or 0,
                 "command_usage": command_usage,
-                "active_members": len(members_data),
+                "active_members": active_members,
                 "average_messages_per_member": (
-                    total_messages / len(members_data) if members_data else 0
+                    total_messages / active_members if active_members else 0
                 ),
             }
         }
@@ -164,13 +165,7 @@ async def is_admin(guild_id: int, request: Request):
     """Check if the user is an admin in the guild"""
     backend: APIServer = request.app.state.backend
     try:
-        access_token = await backend.verify_auth(request)
-        if access_token is None:
-            raise HTTPException(status_code=401, detail="Access token is missing")
-        session = backend.oauth_sessions[access_token]
-
-        # Get user data
-        user = await session.fetch_user()
+        user = (await backend.resolve_auth(request)).user
 
         # Get guild
         guild = await backend.fetch_guild(guild_id)
@@ -365,13 +360,8 @@ async def filter_joined_guilds(request: Request, data: GuildsRequest):
     """Return list of guild IDs that the bot is a member of"""
     backend: APIServer = request.app.state.backend
     try:
-        access_token = await backend.verify_auth(request)
-        if access_token is None:
-            raise HTTPException(status_code=401, detail="Access token is missing")
-        session = backend.oauth_sessions[access_token]
-
-        # Get user's guilds from OAuth session
-        user_guilds = await session.fetch_guilds()
+        # Get user's guilds, fetched at most once per request
+        user_guilds = await backend.resolve_guilds(request)
 
         # Filter guilds that the bot is in
         bot_guild_ids = [str(g.id) for g in backend.client.guilds]
@@ -419,10 +409,9 @@ async def save_settings(
     """Save all settings for a specific page"""
     backend: APIServer = request.app.state.backend
     try:
-        await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Update Settings", {"page": page})
+        await backend.audit.record(
+            guild_id, int(user["id"]), "User Update Settings", {"page": page}
+        )
         if page.replace("-", "_") == "temp_voice":
             settings = await request.json()
             # Handle special case for temp_voice settings
@@ -465,10 +454,9 @@ async def reset_settings(
 ):
     """Reset all settings for a specific page (does not delete the feature/class)"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Reset Settings", {"page": page})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Reset Settings", {"page": page}
+    )
     try:
         feature = await Feature.get_guild_feature(guild_id, page.replace("-", "_"))
         await feature.reset_settings()
@@ -490,10 +478,9 @@ async def set_feature(
 ):
     """Set a feature for a specific guild"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Update class settings", {"class_name": class_name, "feature_set": feature_set_request})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Update class settings", {"class_name": class_name, "feature_set": feature_set_request}
+    )
     featureManager = await Feature.get_guild_feature(guild_id, class_name)
     await featureManager.set_setting(
         feature_set_request.feature_name, feature_set_request.value
@@ -524,10 +511,9 @@ async def reset_feature(
 ):
     """Reset a feature for a specific guild"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Reset class settings", {"class_name": class_name})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Reset class settings", {"class_name": class_name}
+    )
     featureManager = await Feature.get_guild_feature(guild_id, class_name)
     if await featureManager.delete_setting(feature_name):
         return {"success": True}
@@ -541,10 +527,9 @@ async def enable_feature(
 ):
     """Enable a class for a specific guild"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Enabled class", {"class_name": class_name})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Enabled class", {"class_name": class_name}
+    )
     featureManager = await Feature.get_guild_feature(guild_id, class_name)
     if not featureManager.enabled:
         await featureManager.enable()
@@ -559,10 +544,9 @@ async def disable_feature(
 ):
     """Disable a class for a specific guild"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Disabled settings", {"class_name": class_name})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Disabled settings", {"class_name": class_name}
+    )
     featureManager = await Feature.get_guild_feature(guild_id, class_name)
     if featureManager.enabled:
         await featureManager.disable()
@@ -587,10 +571,9 @@ async def create_badge(
 ):
     """Create a new badge"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Created a Badge", {"badge": badge_request.model_dump()})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Created a Badge", {"badge": badge_request.model_dump()}
+    )
     return await createBadge(request, badge_request, guild_id)  # type: ignore
 
 
@@ -610,10 +593,9 @@ async def edit_badge(
 ):
     """Edit an existing badge"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Updated a Badge", {"badge": request_badge.model_dump()})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Updated a Badge", {"badge": request_badge.model_dump()}
+    )
     return await editBadge(badge_id, request, request_badge, guild_id)  # type: ignore
 
 
@@ -623,10 +605,9 @@ async def delete_badge(
 ):
     """Delete a badge"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Deleted a Badge", {"id": badge_id})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Deleted a Badge", {"id": badge_id}
+    )
     return await deleteBadge(badge_id, request, guild_id)  # type: ignore
 
 
@@ -643,12 +624,7 @@ async def create_temp_voice_channel(guild_id: int, request: Request, channel_id:
     backend: APIServer = request.app.state.backend
     try:
         # Verify user has manage channel permissions
-        access_token = await backend.verify_auth(request)
-        if access_token is None:
-            raise HTTPException(status_code=401, detail="Unauthorized")
-
-        session = backend.oauth_sessions[access_token]
-        user = await session.fetch_user()
+        user = (await backend.resolve_auth(request)).user
         guild = await backend.fetch_guild(guild_id)
         member = guild.get_member(int(user["id"]))
 
@@ -1014,10 +990,9 @@ async def create_message(
         if not channel or not isinstance(channel, TextChannel):
             raise HTTPException(status_code=404, detail="Channel not found")
 
-        await Logs.Logger(
-                await backend.fetch_guild(guild_id),
-                await backend.fetch_user(int(user["id"])),
-            ).info("User Created a Message", {"id": message.id,"message": message_request.model_dump()})
+        await backend.audit.record(
+            guild_id, int(user["id"]), "User Created a Message", {"id": message.id,"message": message_request.model_dump()}
+        )
         return JSONResponse(
             {"success": True, "message": "Message created successfully"}
         )
@@ -1046,10 +1021,9 @@ async def delete_message(
 ):
     """Delete a message by ID"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Deleted a Message", {"id": id})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Deleted a Message", {"id": id}
+    )
     try:
         message = await Messages.get_or_none(id=id)
         if not message:
@@ -1147,10 +1121,9 @@ async def update_message(
 ):
     """Update a message by ID"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Updated a Message", {"id": id, "message": message_request.model_dump()})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Updated a Message", {"id": id, "message": message_request.model_dump()}
+    )
     try:
         message = await Messages.get_or_none(id=id)
         if not message:
@@ -1222,10 +1195,9 @@ async def send_message(
 ):
     """Send a message by ID"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Sent a Message", {"id": id})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Sent a Message", {"id": id}
+    )
     try:
         message = await Messages.get_or_none(id=id)
         if not message:
@@ -1326,10 +1298,9 @@ async def create_reaction_roles(
 ):
     """Create or update reaction roles with enhanced validation and support for custom emojis. Adds missing reactions if already present."""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Deleted a Message", {"message_id": reaction_role_request.message_id, "reaction_role": reaction_role_request.model_dump()})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Deleted a Message", {"message_id": reaction_role_request.message_id, "reaction_role": reaction_role_request.model_dump()}
+    )
     try:
         message_id = reaction_role_request.message_id
         reactions = reaction_role_request.reactions
@@ -1471,10 +1442,9 @@ async def delete_reaction_role(
 ):
     """Delete all reaction roles for a specific message ID and remove the reactions"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Deleted a Reaction Roles", {"message_id": message_id})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Deleted a Reaction Roles", {"message_id": message_id}
+    )
     try:
         feature = await Feature.get_guild_feature(guild_id, "reaction_roles")
         reaction_roles = feature.get_setting("reaction_roles") or []
@@ -1541,10 +1511,9 @@ async def delete_reaction_role_by_emoji(
 ):
     """Delete a specific reaction role for a message by emoji and remove the reaction"""
     backend: APIServer = request.app.state.backend
-    await Logs.Logger(
-            await backend.fetch_guild(guild_id),
-            await backend.fetch_user(int(user["id"])),
-        ).info("User Deleted a Specifc Emoji Role", {"message_id": message_id, "emoji": emoji})
+    await backend.audit.record(
+        guild_id, int(user["id"]), "User Deleted a Specifc Emoji Role", {"message_id": message_id, "emoji": emoji}
+    )
     try:
         feature = await Feature.get_guild_feature(guild_id, "reaction_roles")
         reaction_roles = feature.get_setting("reaction_roles") or []
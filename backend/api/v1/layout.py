@@ -3,6 +3,7 @@ from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse
 from typing import TYPE_CHECKING
 from modules.Nexon import colours
+from backend.features.cache import cached
 from .baseModels import *
 from nexon.enums import RequirementType
 
@@ -200,6 +201,29 @@ pages: Dict[str, List] = {
 @router.get("/settings/sidebar")
 async def get_sidebar():
     """Get sidebar settings"""
+    return _build_sidebar()
+
+
+@router.get("/settings/server/sidebar")
+async def get_server_sidebar():
+    """Get server sidebar settings"""
+    return _build_server_sidebar()
+
+
+@router.get("/settings/server/{page}")
+async def get_server_settings_page(page: str):
+    """Get server settings page"""
+    return pages[page]
+
+
+@router.get("/badges/requirements")
+async def get_badges_requirements():
+    return _build_badges_requirements()
+
+
+@cached(ttl=None, tags={"layout"})
+def _build_sidebar() -> Dict[str, List]:
+    """Build the sidebar layout"""
     return {
         "General": [
             {
@@ -211,9 +235,9 @@ async def get_sidebar():
     }
 
 
-@router.get("/settings/server/sidebar")
-async def get_server_sidebar():
-    """Get server sidebar settings"""
+@cached(ttl=None, tags={"layout"})
+def _build_server_sidebar() -> Dict[str, List]:
+    """Build the server sidebar layout"""
     return {
         "General": [
             {
@@ -261,12 +285,7 @@ async def get_server_sidebar():
     }
 
 
-@router.get("/settings/server/{page}")
-async def get_server_settings_page(page: str):
-    """Get server settings page"""
-    return pages[page]
-
-
-@router.get("/badges/requirements")
-async def get_badges_requirements():
+@cached(ttl=None, tags={"layout"})
+def _build_badges_requirements() -> List[str]:
+    """Build the list of badge requirement types"""
     return [requirement.value for requirement in RequirementType]
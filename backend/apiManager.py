@@ -2,10 +2,10 @@ from __future__ import annotations
 
 from datetime import datetime
 import asyncio
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
 from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import uvicorn
 import logging
 from modules.Nexon import debug, config as configDiscord, utils
@@ -20,7 +20,12 @@ from nexon import (
 )
 from nexon.data.models import UserBadge
 from nexon.abc import GuildChannel
+from nexon.errors import Forbidden, NotFound
 from .features.storage import StorageManager
+from .features.security import AuthContext, SessionTokenSigner, SlidingWindowLimiter
+from .features.sessions import OAuthSessionStore
+from .features.audit import AuditLogQueue
+from .features.usage import CommandUsageStore
 from .tasks import start_tasks
 from modules.Nexon import TextChannel, VoiceChannel
 
@@ -30,12 +35,18 @@ from .features.cache import (
     cache_integration, 
     cached, 
     Priority,
+    RefreshMode,
     get_cached_guilds,
     get_cached_user,
-    warm_cache
+    LiveReference
 )
 
 
+def _is_missing(error: BaseException) -> bool:
+    """Whether a failed Discord lookup should be negatively cached"""
+    return isinstance(error, HTTPException) and error.status_code in (403, 404)
+
+
 class APIConfig:
     def __init__(
         self,
@@ -45,6 +56,7 @@ class APIConfig:
         rate_limit_requests: int = 1500,
         rate_limit_window: int = 900,
         cache_ttl: int = 900,
+        oauth_sessions_path: Optional[str] = None,
     ) -> None:
         self.host = host
         self.port = port
@@ -56,6 +68,9 @@ class APIConfig:
         self.rate_limit_requests = rate_limit_requests
         self.rate_limit_window = rate_limit_window
         self.cache_ttl = cache_ttl
+        # Saving sessions keeps users logged in across restarts, but writes
+        # their access and refresh tokens to disk; off unless a path is given
+        self.oauth_sessions_path = oauth_sessions_path
 
 
 class APIServer:
@@ -71,12 +86,14 @@ class APIServer:
         self.config = config
         self.storage = storage
         self.client = client
-        self.oauth_sessions: Dict[str, OAuth2Session] = {}
         self.start_time = utils.utcnow()
-        self.rate_limit_store: Dict[str, List[float]] = {}
+        self.rate_limiter = SlidingWindowLimiter(
+            config.rate_limit_requests, config.rate_limit_window
+        )
         self.background_tasks = BackgroundTasks()
         self._server = None
         self._shutdown_event = asyncio.Event()
+        self._warm_task: Optional[asyncio.Task] = None
         
         # NEW: Initialize the advanced cache system
         self.cache = cache_integration
@@ -99,6 +116,12 @@ class APIServer:
                 redirect_uri=configDiscord.oauth.redirect_url,
                 scopes=DEFAULT_OAUTH_SCOPES,
             )
+        self.oauth_sessions = OAuthSessionStore(
+            self.oauth_client, persist_path=config.oauth_sessions_path
+        )
+        self.session_tokens = SessionTokenSigner(configDiscord.oauth.client_secret)
+        self.audit = AuditLogQueue(self)
+        self.command_usage = CommandUsageStore()
 
         # Initialize FastAPI
         self.app = FastAPI(
@@ -115,62 +138,90 @@ class APIServer:
         # Store backend reference
         self.app.state.backend = self
 
-    async def _rate_limit_check(self, ip: str) -> bool:
-        now = utils.utcnow().timestamp()
-        if ip not in self.rate_limit_store:
-            self.rate_limit_store[ip] = []
-
-        # Remove old timestamps
-        self.rate_limit_store[ip] = [
-            ts
-            for ts in self.rate_limit_store[ip]
-            if now - ts <= self.config.rate_limit_window
-        ]
-
-        if len(self.rate_limit_store[ip]) >= self.config.rate_limit_requests:
-            return False
-
-        self.rate_limit_store[ip].append(now)
-        return True
+    def __cache_key__(self) -> str:
+        """Stable identity for cached methods, so keys survive restarts"""
+        return f"APIServer:{self.config.port}"
 
-    # NEW: Enhanced cached user fetching with advanced cache
-    @cached(ttl=3600, priority=Priority.HIGH, tags={"discord", "users"})
+    async def _rate_limit_check(self, ip: str) -> bool:
+        return self.rate_limiter.allow(ip)
+
+    def _resolve_reference(self, reference: LiveReference) -> Any:
+        """Resolve a cached gateway reference through the client cache"""
+        if reference.kind == "user":
+            return self.client.get_user(reference.id)
+        if reference.kind == "guild":
+            return self.client.get_guild(reference.id)
+        if reference.kind == "channel":
+            return self.client.get_channel(reference.id)
+        return None
+
+    async def _fetch_or_http(
+        self, kind: str, fetch: Callable[[int], Awaitable[Any]], object_id: int
+    ) -> Any:
+        """Fetch an object over Discord's REST API, mapping failures to HTTP errors
+
+        Only 404 and 403 are negatively cached (see ``_is_missing``); outages,
+        rate limits and timeouts become an uncached 502.
+        """
+        try:
+            return await fetch(object_id)
+        except NotFound:
+            raise HTTPException(status_code=404, detail=f"{kind.capitalize()} not found")
+        except Forbidden:
+            raise HTTPException(status_code=403, detail=f"{kind.capitalize()} not accessible")
+        except Exception as e:
+            self.logger.warning(f"Failed to fetch {kind} {object_id}: {e}")
+            raise HTTPException(status_code=502, detail="Discord request failed")
+
+    # Gateway objects are cached as references resolved through the client
+    # and kept current by gateway events; REST fallbacks never see those
+    # events, so they are stored as values with a short TTL
+    @cached(
+        ttl=300, reference_ttl=21600, priority=Priority.HIGH, tags={"discord", "users"},
+        namespace="user", key_tags=lambda self, user_id: {f"user:{user_id}"},
+        negative_ttl=60, negative_on=_is_missing,
+        resolve=lambda reference, self, *_: self._resolve_reference(reference),
+        warm_args=lambda self, user_id: (user_id,)
+    )
     async def fetch_user_cached(self, user_id: int):
         """Cached user fetching with advanced cache system"""
-        user = self.client.get_user(user_id)
-        if not user:
-            try:
-                user = await self.client.fetch_user(user_id)
-            except Exception as e:
-                raise HTTPException(status_code=404, detail="User not found")
-        return user
-
-    # NEW: Enhanced cached guild fetching
-    @cached(ttl=1800, priority=Priority.HIGH, tags={"discord", "guilds"})
+        if self.client.get_user(user_id):
+            return LiveReference("user", user_id)
+        return await self._fetch_or_http("user", self.client.fetch_user, user_id)
+
+    @cached(
+        ttl=300, reference_ttl=21600, priority=Priority.HIGH, tags={"discord", "guilds"},
+        namespace="guild", key_tags=lambda self, guild_id: {f"guild:{guild_id}"},
+        negative_ttl=60, negative_on=_is_missing,
+        resolve=lambda reference, self, *_: self._resolve_reference(reference),
+        warm_args=lambda self, guild_id: (guild_id,)
+    )
     async def fetch_guild_cached(self, guild_id: int):
         """Cached guild fetching with advanced cache system"""
-        guild = self.client.get_guild(guild_id)
-        if not guild:
-            try:
-                guild = await self.client.fetch_guild(guild_id)
-            except Exception as e:
-                raise HTTPException(status_code=404, detail="Guild not found")
-        return guild
-
-    # NEW: Enhanced cached channel fetching
-    @cached(ttl=1200, priority=Priority.MEDIUM, tags={"discord", "channels"})
+        if self.client.get_guild(guild_id):
+            return LiveReference("guild", guild_id)
+        return await self._fetch_or_http("guild", self.client.fetch_guild, guild_id)
+
+    @cached(
+        ttl=300, reference_ttl=21600, priority=Priority.MEDIUM,
+        tags={"discord", "channels"},
+        namespace="guild", key_tags=lambda self, channel_id: {f"channel:{channel_id}"},
+        negative_ttl=60, negative_on=_is_missing,
+        resolve=lambda reference, self, *_: self._resolve_reference(reference),
+        warm_args=lambda self, channel_id: (channel_id,)
+    )
     async def fetch_channel_cached(self, channel_id: int):
         """Cached channel fetching with advanced cache system"""
-        channel = self.client.get_channel(channel_id)
-        if not channel:
-            try:
-                channel = await self.client.fetch_channel(channel_id)
-            except Exception as e:
-                raise HTTPException(status_code=404, detail="Channel not found")
-        return channel
+        if self.client.get_channel(channel_id):
+            return LiveReference("channel", channel_id)
+        return await self._fetch_or_http("channel", self.client.fetch_channel, channel_id)
 
     # NEW: Enhanced cached commands fetching
-    @cached(ttl=7200, priority=Priority.MEDIUM, tags={"bot", "commands"})
+    @cached(
+        ttl=7200, priority=Priority.MEDIUM, tags={"bot", "commands"},
+        refresh_mode=RefreshMode.STALE_WHILE_REVALIDATE, max_stale=3600,
+        namespace="bot", warm_args=lambda self: ()
+    )
     async def get_commands_of_bot_cached(self) -> List[Dict[str, Any]]:
         """Get all bot commands with metadata - cached version"""
         return await self.get_commands_of_bot()
@@ -187,6 +238,15 @@ class APIServer:
                 )
             return await call_next(request)
 
+        @self.app.middleware("http")
+        async def session_token_middleware(request: Request, call_next):
+            response = await call_next(request)
+            # resolve_auth re-issued the session token after contacting Discord
+            session_token = getattr(request.state, "session_token", None)
+            if session_token:
+                self.set_session_cookie(response, session_token)
+            return response
+
         self.app.add_middleware(
             CORSMiddleware,
             allow_origins=self.config.allowed_origins,
@@ -235,15 +295,16 @@ class APIServer:
         
         @self.app.post("/api/cache/warm")
         async def warm_cache_endpoint():
-            """Warm cache with common queries"""
+            """Rebuild the manifest's hot keys that are no longer cached"""
             try:
-                # Define common patterns to pre-cache
-                patterns = [
-                    (self.get_commands_of_bot_cached, [], {}),
-                    # Add more patterns as needed
-                ]
-                await warm_cache(patterns)
-                return JSONResponse({"success": True, "message": "Cache warmed successfully"})
+                # The manifest on disk is the last one saved, by the previous
+                # run or the periodic save; keys still cached are skipped
+                rebuilt = await cache_manager.replay_manifest(receiver=self, concurrency=8)
+                return JSONResponse({
+                    "success": True,
+                    "message": "Cache warmed successfully",
+                    "rebuilt": rebuilt
+                })
             except Exception as e:
                 self.logger.error(f"Error warming cache: {e}")
                 raise HTTPException(status_code=500, detail="Failed to warm cache")
@@ -258,6 +319,18 @@ class APIServer:
         # NEW: Start the cache system
         await cache_manager.start_background_tasks()
         self.logger.info("Advanced cache system initialized")
+        self.audit.start()
+        
+        try:
+            restored = await self.oauth_sessions.load()
+            self.logger.info(f"Restored {restored} OAuth sessions")
+        except Exception as e:
+            self.logger.warning(f"Failed to restore OAuth sessions: {e}")
+        
+        try:
+            await self.command_usage.open()
+        except Exception as e:
+            self.logger.warning(f"Failed to open command usage store: {e}")
         
         # Warm the cache with common data
         try:
@@ -265,6 +338,12 @@ class APIServer:
         except Exception as e:
             self.logger.warning(f"Cache warming failed: {e}")
         
+        # Rebuild last run's hot keys while the server comes up; early
+        # visitors share these loads instead of starting their own
+        self._warm_task = asyncio.create_task(
+            cache_manager.replay_manifest(receiver=self, concurrency=8)
+        )
+        
         await start_tasks(self)
         config = uvicorn.Config(
             app=self.app,
@@ -304,10 +383,26 @@ class APIServer:
             self.logger.info("Shutting down API server...")
             self._server.should_exit = True
             
+            if self._warm_task and not self._warm_task.done():
+                self._warm_task.cancel()
+            
+            # Audit writes still resolve guilds and users through the cache
+            await self.audit.stop()
+            
             # NEW: Stop cache background tasks
             await cache_manager.stop_background_tasks()
             self.logger.info("Cache system stopped")
             
+            try:
+                await self.oauth_sessions.save()
+            except Exception as e:
+                self.logger.warning(f"Failed to save OAuth sessions: {e}")
+            
+            try:
+                await self.command_usage.close()
+            except Exception as e:
+                self.logger.warning(f"Failed to flush command usage: {e}")
+            
             await self._cleanup()
             self._server = None
 
@@ -315,50 +410,81 @@ class APIServer:
         """Cleanup resources"""
         # OAuth2Session does not require explicit closing
         self.oauth_sessions.clear()
-        self.rate_limit_store.clear()
+        self.rate_limiter.clear()
+
+    def get_oauth_session(self, access_token: str) -> OAuth2Session:
+        """Get the OAuth session of an access token, creating it if needed"""
+        session = self.oauth_sessions.get(access_token)
+        if session is None:
+            self.logger.info("Creating new OAuth session for access token")
+            oauth_token = OAuth2Token(
+                {"access_token": access_token, "token_type": "Bearer"}
+            )
+            session = OAuth2Session(self.oauth_client, oauth_token)
+            self.oauth_sessions.put(access_token, session, oauth_token)
+        return session
+
+    async def resolve_auth(self, request: Request) -> AuthContext:
+        """Authenticate the request once; later calls reuse ``request.state.auth``
+
+        A valid signed session token is accepted without any network I/O;
+        otherwise Discord is asked and a fresh token is issued.
+        """
+        auth: Optional[AuthContext] = getattr(request.state, "auth", None)
+        if auth is not None:
+            return auth
 
-    async def verify_auth(self, request: Request) -> Optional[str]:
-        """Verify authentication and return access token if valid - Enhanced with caching"""
         access_token = request.cookies.get("accessToken")
         if not access_token:
             self.logger.warning("Access token not found in cookies")
             raise HTTPException(status_code=401, detail="Not authenticated")
 
-        # Check the advanced cache first
-        cached_user = await self.cache.get_cached_user(access_token)
-        if cached_user:
-            # Validate cached user data
-            if "id" in cached_user and "username" in cached_user:
-                self.logger.debug("User found in cache")
-                return access_token
-            else:
-                self.logger.warning("Cached user data is invalid")
+        session_token = request.cookies.get("sessionToken")
+        if session_token:
+            auth = self.session_tokens.verify(session_token, access_token)
+        if auth is None:
+            auth = await self.refresh_auth(access_token)
+            request.state.session_token = self.issue_session_token(auth)
 
-        # Get or create OAuth session
-        if access_token not in self.oauth_sessions:
-            self.logger.info("Creating new OAuth session for access token")
-            oauth_token = OAuth2Token(
-                {"access_token": access_token, "token_type": "Bearer"}
-            )
-            self.oauth_sessions[access_token] = OAuth2Session(
-                self.oauth_client, oauth_token
-            )
+        request.state.auth = auth
+        return auth
 
+    async def refresh_auth(self, access_token: str) -> AuthContext:
+        """Look the caller up on Discord (through the cache)"""
         try:
-            session = self.oauth_sessions[access_token]
-            user = await session.fetch_user()
-
-            # Convert user object to dictionary and cache it
-            self.cache.cache_user(access_token, user) # type: ignore
-
+            # At most one /users/@me call, shared with concurrent requests
+            user = await get_cached_user(self, access_token)
         except Exception as e:
             self.logger.error(f"Error during session fetch: {e}")
             # Clear invalid session and raise an error
-            if access_token in self.oauth_sessions:
-                del self.oauth_sessions[access_token]
+            self.oauth_sessions.pop(access_token, None)
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        return access_token
+        return AuthContext(access_token=access_token, user=user)
+
+    def issue_session_token(self, auth: AuthContext) -> str:
+        return self.session_tokens.issue(auth.access_token, auth.user)
+
+    def set_session_cookie(self, response: Response, session_token: str) -> None:
+        response.set_cookie(
+            "sessionToken",
+            session_token,
+            max_age=self.session_tokens.ttl,
+            httponly=True,
+            secure=not debug,
+            samesite="strict",
+        )
+
+    async def resolve_guilds(self, request: Request) -> List[Dict[str, Any]]:
+        """The caller's guild list, fetched at most once per request"""
+        auth = await self.resolve_auth(request)
+        if auth.guilds is None:
+            auth.guilds = await get_cached_guilds(self, auth.access_token)
+        return auth.guilds
+
+    async def verify_auth(self, request: Request) -> Optional[str]:
+        """Verify authentication and return access token if valid - Enhanced with caching"""
+        return (await self.resolve_auth(request)).access_token
 
     async def get_commands_of_bot(self) -> List[Dict[str, Any]]:
         """Get all bot commands with metadata"""
@@ -535,13 +661,22 @@ class APIServer:
         return message
 
     # NEW: Cache management methods
-    async def invalidate_user_cache(self, user_id: int):
+    async def invalidate_user_cache(self, user_id: int) -> int:
         """Invalidate cache for a specific user"""
-        await cache_manager.invalidate_by_tags({"discord", "users"})
+        return await cache_manager.invalidate_by_tags({f"user:{user_id}"})
     
-    async def invalidate_guild_cache(self, guild_id: int):
+    async def invalidate_guild_cache(self, guild_id: int) -> int:
         """Invalidate cache for a specific guild"""
-        await cache_manager.invalidate_by_tags({"discord", "guilds"})
+        return await cache_manager.invalidate_by_tags({f"guild:{guild_id}"})
+    
+    async def invalidate_channel_cache(
+        self, channel_id: int, guild_id: Optional[int] = None
+    ) -> int:
+        """Invalidate cache for a specific channel and, optionally, its guild"""
+        tags = {f"channel:{channel_id}"}
+        if guild_id is not None:
+            tags.add(f"guild:{guild_id}")
+        return await cache_manager.invalidate_by_tags(tags)
     
     async def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics"""
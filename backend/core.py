@@ -89,6 +89,72 @@ class DashboardCog(commands.Cog):
             await self.cleanup()
             raise
 
+    # Gateway events invalidate exactly the cache entries they affect, which
+    # also clears negative "not found" entries for objects that now exist
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild) -> None:
+        await self.api.invalidate_guild_cache(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild) -> None:
+        await self.api.invalidate_guild_cache(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before, after) -> None:
+        await self.api.invalidate_guild_cache(after.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel) -> None:
+        await self.api.invalidate_channel_cache(channel.id, channel.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after) -> None:
+        await self.api.invalidate_channel_cache(after.id, after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel) -> None:
+        await self.api.invalidate_channel_cache(channel.id, channel.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role) -> None:
+        await self.api.invalidate_guild_cache(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after) -> None:
+        await self.api.invalidate_guild_cache(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role) -> None:
+        await self.api.invalidate_guild_cache(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_emojis_update(self, guild, before, after) -> None:
+        await self.api.invalidate_guild_cache(guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member) -> None:
+        await self.api.invalidate_user_cache(member.id)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after) -> None:
+        await self.api.invalidate_guild_cache(after.guild.id)
+        await self.api.invalidate_user_cache(after.id)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before, after) -> None:
+        await self.api.invalidate_user_cache(after.id)
+
+    @commands.Cog.listener()
+    async def on_application_command_completion(self, interaction) -> None:
+        if not interaction.application_command:
+            return
+        name = interaction.application_command.qualified_name
+        # DMs and user installs count globally too, just not towards a guild
+        self.api.command_usage.track(name)
+        if interaction.guild_id is not None:
+            self.api.command_usage.record(interaction.guild_id, name)
+
     def _handle_api_task_done(self, task: asyncio.Task) -> None:
         """Handle API server task completion"""
         try:
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional
+
+from nexon import Logs
+from tortoise.transactions import in_transaction
+
+if TYPE_CHECKING:
+    from backend.apiManager import APIServer
+
+logger = logging.getLogger(__name__)
+
+
+class AuditEvent(NamedTuple):
+    guild_id: int
+    user_id: int
+    message: str
+    details: Optional[Dict[str, Any]]
+    level: str
+    created_at: float
+
+    def payload(self) -> Dict[str, Any]:
+        """Details plus when the change happened; the Logs row is stamped at flush"""
+        return {**(self.details or {}), "recorded_at": self.created_at}
+
+
+class AuditLogQueue:
+    """Writes dashboard audit events to the Logs table off the request path"""
+
+    def __init__(
+        self,
+        backend: APIServer,
+        # When full, record waits put_timeout for room and then drops the
+        # event, so a stalled database cannot grow memory without bound
+        max_pending: int = 10_000,
+        # Events per transaction, written at least every flush_interval
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        put_timeout: float = 0.5,
+    ) -> None:
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: asyncio.Queue[AuditEvent] = asyncio.Queue(max_pending)
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._closing = False
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush the queue and stop the worker"""
+        self._closing = True
+        if self._worker is None:
+            await self.flush()
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._worker), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Audit log flush timed out; {len(self)} events not written")
+            self._worker.cancel()
+        self._worker = None
+
+    async def record(
+        self,
+        guild_id: int,
+        user_id: int,
+        message: str,
+        details: Optional[Dict[str, Any]] = None,
+        level: str = "info",
+    ) -> bool:
+        """Queue an audit event; False if it was dropped under backpressure"""
+        event = AuditEvent(guild_id, user_id, message, details, level, time.time())
+        if self._closing and not self.running:
+            # Shutting down: nothing will drain the queue, write it directly
+            await self._write([event])
+            return True
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            pass
+        try:
+            await asyncio.wait_for(self._queue.put(event), self.put_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            logger.warning(f"Audit log queue full, dropped event: {message}")
+            return False
+
+    async def flush(self) -> int:
+        """Write every queued event now; returns how many were taken"""
+        taken = 0
+        while not self._queue.empty():
+            batch = self._drain()
+            taken += len(batch)
+            await self._write(batch)
+        return taken
+
+    def _drain(self, batch: Optional[List[AuditEvent]] = None) -> List[AuditEvent]:
+        batch = batch if batch is not None else []
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while not (self._closing and self._queue.empty()):
+            try:
+                first = await asyncio.wait_for(self._queue.get(), self.flush_interval)
+            except asyncio.TimeoutError:
+                continue
+            # Let a burst of mutations pile up into one transaction
+            if self._queue.qsize() + 1 < self.batch_size and not self._closing:
+                await asyncio.sleep(self.flush_interval / 10)
+            await self._write(self._drain([first]))
+
+    async def _write(self, batch: List[AuditEvent]) -> None:
+        # Resolve everything first so the transaction only spans the inserts
+        loggers = []
+        for event in batch:
+            try:
+                guild = await self.backend.fetch_guild(event.guild_id)
+                user = await self.backend.fetch_user(event.user_id)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Dropping audit event {event.message!r}: {e}")
+                continue
+            loggers.append((Logs.Logger(guild, user), event))
+        if not loggers:
+            return
+        try:
+            async with in_transaction():
+                for audit_logger, event in loggers:
+                    await getattr(audit_logger, event.level)(event.message, event.payload())
+            self.written += len(loggers)
+        except Exception as e:
+            self.failed += len(loggers)
+            logger.error(f"Failed to write {len(loggers)} audit events: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
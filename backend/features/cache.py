@@ -1,28 +1,36 @@
 import asyncio
 import hashlib
+import heapq
+import inspect
+import itertools
 import json
 import logging
+import lzma
+import math
+import random
+import sys
 import time
 import weakref
 from abc import ABC, abstractmethod
 from collections import OrderedDict, defaultdict
 from contextlib import asynccontextmanager
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from enum import Enum
-from functools import wraps
+from functools import partial, wraps
 from typing import (
     Any, Callable, Dict, Generic, List, Optional, Set, TypeVar, Union,
-    Awaitable, Tuple, NamedTuple
+    Awaitable, Tuple, NamedTuple, Iterable
 )
 import pickle
+import sqlite3
 import zlib
-from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-from nexon.OAuth2.session import OAuth2Session
-from nexon.OAuth2.token import OAuth2Token
 from nexon.types.oauth2 import Guild, User
+from backend.features.sqlite_writer import SQLiteBatchWriter
 from typing import TYPE_CHECKING
+
 if TYPE_CHECKING:
     from backend.apiManager import APIServer
     
@@ -50,6 +58,19 @@ class CacheLevel(Enum):
     L3_PERSISTENT = 3  # Disk-based cache
 
 
+class RefreshMode(Enum):
+    """How cached() refreshes entries around expiry"""
+    NONE = "none"  # Entry is fresh until it expires, then gone
+    STALE_WHILE_REVALIDATE = "stale_while_revalidate"  # Serve stale, refresh in background
+    EARLY = "early"  # Probabilistically refresh shortly before expiry
+
+
+class EvictionPolicy(Enum):
+    """How a namespace's entries compete for L1"""
+    LRU = "lru"  # Every new key is admitted, least recently used goes first
+    TINY_LFU = "tiny_lfu"  # New keys must out-rank the LRU victims to get in
+
+
 class Priority(Enum):
     """Cache priority levels"""
     CRITICAL = 1
@@ -70,12 +91,62 @@ class CacheMetrics:
     creation_time: float = field(default_factory=time.time)
     access_frequency: float = 0.0
     hit_rate: float = 0.0
+    coalesced: int = 0  # Misses that awaited an in-flight load instead of loading
+    expirations: int = 0
+    demotions: int = 0  # L1 evictions moved down to L2 instead of dropped
+    admission_rejections: int = 0  # New keys L1 turned away, stored in L2 instead
+    level_evictions: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    negative_hits: int = 0
+    reference_hits: int = 0
+    dangling_references: int = 0  # References whose object left the client cache
+    stale_hits: int = 0
+    background_refreshes: int = 0
+    early_refreshes: int = 0
+    refresh_failures: int = 0
     
     def update_hit_rate(self):
         total = self.hits + self.misses
         self.hit_rate = self.hits / total if total > 0 else 0.0
 
 
+_SIZE_SAMPLE = 8
+_SCALAR_TYPES = (str, bytes, bytearray, int, float, bool, type(None))
+
+
+def estimate_size(value: Any, depth: int = 1) -> int:
+    """Cheaply estimate a value's memory footprint by sampling its containers"""
+    size = sys.getsizeof(value, 64)
+    if depth <= 0 or isinstance(value, _SCALAR_TYPES):
+        return size
+
+    if isinstance(value, dict):
+        count = len(value)
+        if not count:
+            return size
+        sample = 0
+        for i, (k, v) in enumerate(value.items()):
+            if i >= _SIZE_SAMPLE:
+                break
+            sample += estimate_size(k, depth - 1) + estimate_size(v, depth - 1)
+        return size + sample * count // min(count, _SIZE_SAMPLE)
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        count = len(value)
+        if not count:
+            return size
+        sample = 0
+        for i, item in enumerate(value):
+            if i >= _SIZE_SAMPLE:
+                break
+            sample += estimate_size(item, depth - 1)
+        return size + sample * count // min(count, _SIZE_SAMPLE)
+
+    attrs = getattr(value, '__dict__', None)
+    if isinstance(attrs, dict):
+        return size + estimate_size(attrs, depth - 1)
+    return size
+
+
 @dataclass
 class CacheEntry(Generic[T]):
     """Enhanced cache entry with comprehensive metadata"""
@@ -92,25 +163,47 @@ class CacheEntry(Generic[T]):
     compressed: bool = False
     checksum: Optional[str] = None
     dependencies: Set[str] = field(default_factory=set)
+    namespace: Optional[str] = None
+    size_measured: bool = False
+    # Set for entries that may be served stale until expires_at
+    fresh_until: Optional[float] = None
+    # Seconds the last load took, used to schedule early refreshes
+    load_time: float = 0.0
     
-    def __post_init__(self):
-        self.size = self._calculate_size()
-        self.checksum = self._calculate_checksum()
+    def _serialize(self) -> bytes:
+        """Serialize the cached value for sizing and hashing"""
+        try:
+            return pickle.dumps(self.value)
+        except Exception:
+            return str(self.value).encode()
     
     def _calculate_size(self) -> int:
         """Calculate memory size of the cached value"""
-        try:
-            return len(pickle.dumps(self.value))
-        except:
-            return len(str(self.value))
+        return len(self._serialize())
     
     def _calculate_checksum(self) -> str:
         """Calculate checksum for data integrity"""
-        try:
-            data = pickle.dumps(self.value)
-            return hashlib.sha256(data).hexdigest()
-        except:
-            return hashlib.sha256(str(self.value).encode()).hexdigest()
+        return hashlib.sha256(self._serialize()).hexdigest()
+    
+    def estimate(self) -> int:
+        """Return the known size, falling back to a cheap shallow estimate"""
+        if not self.size:
+            self.size = estimate_size(self.value)
+        return self.size
+    
+    def measure_size(self) -> int:
+        """Replace the size estimate with the exact serialized size"""
+        if not self.size_measured:
+            self.size = self._calculate_size()
+            self.size_measured = True
+        return self.size
+    
+    def seal(self) -> None:
+        """Measure size and compute the checksum from a single serialization"""
+        data = self._serialize()
+        self.size = len(data)
+        self.size_measured = True
+        self.checksum = hashlib.sha256(data).hexdigest()
     
     def is_expired(self) -> bool:
         """Check if entry has expired"""
@@ -118,6 +211,20 @@ class CacheEntry(Generic[T]):
             return False
         return time.time() > self.expires_at
     
+    def is_stale(self) -> bool:
+        """Check if entry is past its fresh window but still servable"""
+        if self.fresh_until is None:
+            return False
+        return time.time() > self.fresh_until
+    
+    def should_refresh_early(self, beta: float = 1.0) -> bool:
+        """Probabilistic early expiration: likelier the closer the deadline and the slower the load"""
+        deadline = self.fresh_until if self.fresh_until is not None else self.expires_at
+        if deadline is None:
+            return False
+        jitter = -math.log(1.0 - random.random())
+        return time.time() + self.load_time * beta * jitter >= deadline
+    
     def touch(self):
         """Update access statistics"""
         current_time = time.time()
@@ -128,6 +235,8 @@ class CacheEntry(Generic[T]):
     
     def verify_integrity(self) -> bool:
         """Verify data integrity using checksum"""
+        if self.checksum is None:
+            return True
         return self.checksum == self._calculate_checksum()
 
 
@@ -219,6 +328,17 @@ class AdaptiveInvalidation(CacheInvalidationStrategy):
 class CacheBackend(ABC, Generic[K, V]):
     """Abstract cache backend interface"""
     
+    # Called with the key (and entry, when the backend still has it) of every
+    # entry the backend drops on its own
+    on_evict: Optional[Callable[[K, Optional[V]], None]] = None
+    
+    def _notify_evict(self, key: K, value: Optional[V] = None) -> None:
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+    
+    def __contains__(self, key: K) -> bool:
+        return key in getattr(self, 'data', ())
+    
     @abstractmethod
     async def get(self, key: K) -> Optional[V]:
         pass
@@ -240,122 +360,954 @@ class CacheBackend(ABC, Generic[K, V]):
         pass
 
 
+# Halves every counter of a sketch row in one C-level pass
+_HALVE = bytes(i >> 1 for i in range(256))
+
+
+class FrequencySketch:
+    """Count-min sketch of recent key popularity, as used by TinyLFU"""
+    
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5)
+    
+    def __init__(self, width: int = 4096):
+        self.width = 1 << max(width - 1, 1).bit_length()
+        self.mask = self.width - 1
+        self.rows = [bytearray(self.width) for _ in self._SEEDS]
+        self.sample_size = 10 * self.width
+        self.additions = 0
+    
+    def _indexes(self, key: str) -> List[int]:
+        h = hash(key)
+        mask = self.mask
+        return [((h * seed) >> 17 ^ h) & mask for seed in self._SEEDS]
+    
+    def increment(self, key: str) -> None:
+        """Record one access to a key"""
+        for row, index in zip(self.rows, self._indexes(key)):
+            if row[index] < 15:
+                row[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.reset()
+    
+    def frequency(self, key: str) -> int:
+        """Estimated recent access count of a key"""
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+    
+    def reset(self) -> None:
+        """Age the sketch by halving every counter"""
+        self.rows = [bytearray(row.translate(_HALVE)) for row in self.rows]
+        self.additions //= 2
+
+
 class MemoryBackend(CacheBackend[str, CacheEntry]):
     """High-performance in-memory cache backend"""
     
-    def __init__(self, max_size: int = 10000):
+    # Called with the key and entry of every new key admission turns away
+    on_reject: Optional[Callable[[str, CacheEntry], None]] = None
+    
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, max_size: Optional[int] = None):
         self.data: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.max_bytes = max_bytes
         self.max_size = max_size
-        self._lock = asyncio.Lock()
+        self.sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+        # Sized for roughly one counter per 512 bytes of budget
+        self.sketch = FrequencySketch(max_size or max(max_bytes // 512, 1024))
+        # TinyLFU: once full, a new key only displaces LRU victims it is
+        # looked up more often than; switchable per namespace
+        self.admission_default = True
+        self.admission: Dict[str, bool] = {}
+        self.rejections = 0
+        # Per-namespace LRU order and bytes; a namespace over its quota only
+        # evicts its own entries, and entries without one share the None
+        # segment, evicted first when the level is over budget
+        self.quotas: Dict[str, int] = {}
+        self.segments: Dict[Optional[str], OrderedDict[str, None]] = defaultdict(OrderedDict)
+        self.namespace_bytes: Dict[Optional[str], int] = defaultdict(int)
+    
+    def _segment_name(self, namespace: Optional[str]) -> Optional[str]:
+        return namespace if namespace in self.quotas else None
+    
+    def _admission_enabled(self, namespace: Optional[str]) -> bool:
+        if namespace is None:
+            return self.admission_default
+        return self.admission.get(namespace, self.admission_default)
+    
+    def _beats(self, key: str, victims: Iterable[str], excess: int, count_excess: int = 0) -> bool:
+        """Whether a key is more popular than each victim needed to make room"""
+        candidate = self.sketch.frequency(key)
+        for victim in victims:
+            if self.sketch.frequency(victim) >= candidate:
+                return False
+            excess -= self.sizes.get(victim, 0)
+            count_excess -= 1
+            if excess <= 0 and count_excess <= 0:
+                return True
+        return True
+    
+    def _admit(self, key: str, size: int, namespace: Optional[str]) -> bool:
+        """Whether a new key beats the LRU entries it would push out"""
+        segment = self._segment_name(namespace)
+        if segment is not None:
+            excess = self.namespace_bytes[segment] + size - self.quotas[segment]
+            if excess > 0:
+                return self._beats(key, self.segments[segment], excess)
+        
+        excess = self.total_bytes + size - self.max_bytes
+        count_excess = len(self.data) + 1 - self.max_size if self.max_size is not None else 0
+        if excess <= 0 and count_excess <= 0:
+            return True
+        victims = itertools.chain(self.segments.get(None, ()), self.data)
+        return self._beats(key, victims, excess, count_excess)
+    
+    def _account(self, key: str, entry: CacheEntry, size: int) -> None:
+        segment = self._segment_name(entry.namespace)
+        self.sizes[key] = size
+        self.total_bytes += size
+        self.namespace_bytes[segment] += size
+        self.segments[segment][key] = None
+    
+    def _unaccount(self, key: str, entry: CacheEntry) -> None:
+        size = self.sizes.pop(key, 0)
+        segment = self._segment_name(entry.namespace)
+        self.total_bytes -= size
+        self.namespace_bytes[segment] -= size
+        self.segments[segment].pop(key, None)
+    
+    def _evict(self, key: str) -> None:
+        entry = self.data.pop(key)
+        self._unaccount(key, entry)
+        self._notify_evict(key, entry)
+    
+    def get_nowait(self, key: str) -> Optional[CacheEntry]:
+        """Synchronous lookup used by the lock-free hit path"""
+        self.sketch.increment(key)
+        entry = self.data.get(key)
+        if entry is not None:
+            # Move to end (LRU)
+            self.data.move_to_end(key)
+            self.segments[self._segment_name(entry.namespace)].move_to_end(key)
+        return entry
     
     async def get(self, key: str) -> Optional[CacheEntry]:
-        async with self._lock:
-            if key in self.data:
-                entry = self.data[key]
-                # Move to end (LRU)
-                self.data.move_to_end(key)
-                return entry
-            return None
+        return self.get_nowait(key)
+    
+    def put(self, key: str, value: CacheEntry) -> None:
+        """Store an entry and evict until the level is back under budget"""
+        size = value.estimate()
+        previous = self.data.get(key)
+        if (previous is None and self._admission_enabled(value.namespace)
+                and not self._admit(key, size, value.namespace)):
+            self.rejections += 1
+            if self.on_reject is not None:
+                self.on_reject(key, value)
+            return
+        if previous is not None:
+            self._unaccount(key, previous)
+        
+        self._account(key, value, size)
+        self.data[key] = value
+        self.data.move_to_end(key)
+        
+        # A namespace over its quota only evicts its own entries
+        segment_name = self._segment_name(value.namespace)
+        segment = self.segments[segment_name]
+        if segment_name is not None:
+            quota = self.quotas[segment_name]
+            while len(segment) > 1 and self.namespace_bytes[segment_name] > quota:
+                self._evict(next(iter(segment)))
+        
+        shared = self.segments[None]
+        while len(self.data) > 1 and (
+            self.total_bytes > self.max_bytes
+            or (self.max_size is not None and len(self.data) > self.max_size)
+        ):
+            # Evict least recently used, starting with entries outside any quota
+            self._evict(next(iter(shared or self.data)))
     
     async def set(self, key: str, value: CacheEntry, ttl: Optional[int] = None) -> None:
-        async with self._lock:
-            if len(self.data) >= self.max_size and key not in self.data:
-                # Evict least recently used
-                self.data.popitem(last=False)
-            
-            self.data[key] = value
-            self.data.move_to_end(key)
+        self.put(key, value)
     
     async def delete(self, key: str) -> bool:
-        async with self._lock:
-            return self.data.pop(key, None) is not None
+        entry = self.data.pop(key, None)
+        if entry is None:
+            return False
+        self._unaccount(key, entry)
+        return True
     
     async def clear(self) -> None:
-        async with self._lock:
-            self.data.clear()
+        self.data.clear()
+        self.sizes.clear()
+        self.segments.clear()
+        self.namespace_bytes.clear()
+        self.total_bytes = 0
+        self.sketch = FrequencySketch(self.sketch.width)
+    
+    def set_quota(self, namespace: str, max_bytes: Optional[int]) -> None:
+        """Give a namespace its own byte quota, or fold it back into the shared space"""
+        entries = [(key, entry) for key, entry in self.data.items() if entry.namespace == namespace]
+        for key, entry in entries:
+            self._unaccount(key, entry)
+        if max_bytes is None:
+            self.quotas.pop(namespace, None)
+        else:
+            self.quotas[namespace] = max_bytes
+        for key, entry in entries:
+            self._account(key, entry, entry.estimate())
     
     async def exists(self, key: str) -> bool:
         return key in self.data
 
 
+class Codec:
+    """Byte codec used by CompressedBackend; the base class stores data as-is"""
+    name = "raw"
+    
+    def encode(self, data: bytes) -> bytes:
+        return data
+    
+    def decode(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibCodec(Codec):
+    """Fast deflate for medium entries"""
+    
+    def __init__(self, level: int = 1):
+        self.level = level
+        self.name = f"zlib-{level}"
+    
+    def encode(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+    
+    def decode(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class LzmaCodec(Codec):
+    """Slow but dense compression for large entries that have gone cold"""
+    name = "lzma"
+    
+    def __init__(self, preset: int = 6):
+        self.preset = preset
+    
+    def encode(self, data: bytes) -> bytes:
+        return lzma.compress(data, preset=self.preset)
+    
+    def decode(self, data: bytes) -> bytes:
+        return lzma.decompress(data)
+
+
+# Serialized size at which each codec takes over on write
+DEFAULT_CODECS: Tuple[Tuple[int, Codec], ...] = (
+    (0, Codec()),
+    (1024, ZlibCodec(1)),
+)
+
+class _Packed(NamedTuple):
+    """A compressed entry: metadata kept as an object, only the value encoded"""
+    meta: CacheEntry
+    codec: Codec
+    payload: bytes
+    size: int  # Serialized bytes before encoding
+    # Monotonic time of the last put or read, to tell cold entries apart
+    touched: float
+
+
 class CompressedBackend(CacheBackend[str, CacheEntry]):
     """Compressed memory backend for larger datasets"""
     
-    def __init__(self, compression_level: int = 6):
-        self.data: Dict[str, bytes] = {}
-        self.compression_level = compression_level
-        self._lock = asyncio.Lock()
+    # Rough cost of the metadata object kept next to each payload
+    META_BYTES = 256
+    
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        # (minimum pickled size, codec) pairs, picked per entry
+        codecs: Tuple[Tuple[int, Codec], ...] = DEFAULT_CODECS,
+        # Entries of at least cold_min_bytes not read for cold_after seconds
+        # are moved to cold_codec by recompress_cold
+        cold_codec: Optional[Codec] = None,
+        cold_after: float = 600,
+        cold_min_bytes: int = 64 * 1024
+    ):
+        self.data: OrderedDict[str, _Packed] = OrderedDict()
+        self.codecs = sorted(codecs, key=lambda step: step[0])
+        self.cold_codec = cold_codec if cold_codec is not None else LzmaCodec()
+        self.cold_after = cold_after
+        self.cold_min_bytes = cold_min_bytes
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.recompressed = 0
+    
+    def _codec_for(self, size: int) -> Codec:
+        chosen = self.codecs[0][1]
+        for min_size, codec in self.codecs:
+            if size < min_size:
+                break
+            chosen = codec
+        return chosen
+    
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """The entry's metadata, with ``value`` unset, without decoding it"""
+        packed = self.data.get(key)
+        return packed.meta if packed is not None else None
     
     async def get(self, key: str) -> Optional[CacheEntry]:
-        async with self._lock:
-            if key in self.data:
-                compressed_data = self.data[key]
-                pickled_data = zlib.decompress(compressed_data)
-                return pickle.loads(pickled_data)
+        packed = self.data.get(key)
+        if packed is None:
             return None
+        self.data[key] = packed._replace(touched=time.monotonic())
+        self.data.move_to_end(key)
+        try:
+            data = packed.codec.decode(packed.payload)
+            value = pickle.loads(data)
+        except Exception as e:
+            logger.debug(f"Dropping unreadable compressed entry {key}: {e}")
+            await self.delete(key)
+            return None
+        return replace(packed.meta, value=value)
+    
+    def put(self, key: str, value: CacheEntry) -> bool:
+        """Encode and store an entry; returns False if it cannot be serialized"""
+        try:
+            data = pickle.dumps(value.value)
+        except Exception as e:
+            logger.debug(f"Cannot compress cache entry {key}: {e}")
+            return False
+        codec = self._codec_for(len(data))
+        packed = _Packed(
+            replace(value, value=None), codec, codec.encode(data), len(data),
+            time.monotonic()
+        )
+        
+        old = self.data.get(key)
+        self.total_bytes += len(packed.payload) + self.META_BYTES
+        if old is not None:
+            self.total_bytes -= len(old.payload) + self.META_BYTES
+        self.data[key] = packed
+        self.data.move_to_end(key)
+        
+        while len(self.data) > 1 and self.total_bytes > self.max_bytes:
+            evicted_key, evicted = self.data.popitem(last=False)
+            self.total_bytes -= len(evicted.payload) + self.META_BYTES
+            self._notify_evict(evicted_key)
+        return True
     
     async def set(self, key: str, value: CacheEntry, ttl: Optional[int] = None) -> None:
-        async with self._lock:
-            pickled_data = pickle.dumps(value)
-            compressed_data = zlib.compress(pickled_data, self.compression_level)
-            self.data[key] = compressed_data
+        self.put(key, value)
+    
+    async def recompress_cold(self, limit: int = 16) -> int:
+        """Move up to ``limit`` cold, large entries to ``cold_codec`` off the event loop"""
+        deadline = time.monotonic() - self.cold_after
+        candidates = []
+        for key, packed in self.data.items():
+            if packed.touched > deadline or len(candidates) >= limit:
+                break
+            if packed.codec is not self.cold_codec and packed.size >= self.cold_min_bytes:
+                candidates.append((key, packed))
+        
+        moved = 0
+        cold_codec = self.cold_codec
+        for key, packed in candidates:
+            data = await asyncio.to_thread(packed.codec.decode, packed.payload)
+            payload = await asyncio.to_thread(cold_codec.encode, data)
+            # Skip entries replaced, read or deleted while encoding
+            if self.data.get(key) is not packed or len(payload) >= len(packed.payload):
+                continue
+            self.data[key] = packed._replace(codec=cold_codec, payload=payload)
+            self.total_bytes += len(payload) - len(packed.payload)
+            moved += 1
+        self.recompressed += moved
+        return moved
     
     async def delete(self, key: str) -> bool:
-        async with self._lock:
-            return self.data.pop(key, None) is not None
+        packed = self.data.pop(key, None)
+        if packed is None:
+            return False
+        self.total_bytes -= len(packed.payload) + self.META_BYTES
+        return True
     
     async def clear(self) -> None:
-        async with self._lock:
-            self.data.clear()
+        self.data.clear()
+        self.total_bytes = 0
     
     async def exists(self, key: str) -> bool:
         return key in self.data
 
 
+class PersistentBackend(CacheBackend[str, CacheEntry]):
+    """SQLite-backed disk tier that survives restarts"""
+    
+    # Share of free pages at which compact() rebuilds the file
+    VACUUM_FREE_RATIO = 0.25
+    
+    def __init__(
+        self,
+        path: Union[str, Path] = "Data/Cache/dashboard_cache.db",
+        max_bytes: int = 64 * 1024 * 1024,
+        flush_delay: float = 1.0
+    ):
+        self.max_bytes = max_bytes
+        # key -> (expires_at, size in bytes on disk), so misses and expiry
+        # checks never touch the disk
+        self.index: OrderedDict[str, Tuple[Optional[float], int]] = OrderedDict()
+        self.total_bytes = 0
+        # Writes not yet flushed; None marks a pending delete. Batches are
+        # pickled and written on the writer's worker thread
+        self._pending: Dict[str, Optional[CacheEntry]] = {}
+        self._db = SQLiteBatchWriter(path, self.flush, flush_delay, thread_name="cache-l3")
+    
+    @property
+    def path(self) -> Path:
+        return self._db.path
+    
+    def __contains__(self, key: str) -> bool:
+        if key in self._pending:
+            return self._pending[key] is not None
+        return key in self.index
+    
+    @staticmethod
+    def _setup_sync(conn: sqlite3.Connection) -> List[Tuple[str, Optional[float], int, str]]:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, "
+            "size INTEGER NOT NULL, tags TEXT NOT NULL DEFAULT '[]', "
+            "written_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time(),)
+        )
+        return conn.execute(
+            "SELECT key, expires_at, size, tags FROM entries ORDER BY written_at"
+        ).fetchall()
+    
+    async def open(self) -> Dict[str, Set[str]]:
+        """Open the database and load the index; returns the stored tags per key"""
+        if self._db.is_open:
+            return {}
+        rows = await self._db.open(self._setup_sync)
+        self.index.clear()
+        self.total_bytes = 0
+        tags_by_key: Dict[str, Set[str]] = {}
+        for key, expires_at, size, tags in rows:
+            self.index[key] = (expires_at, size)
+            self.total_bytes += size
+            tags_by_key[key] = set(json.loads(tags))
+        await self._evict_to_fit()
+        if self._pending:
+            self._db.schedule_flush()
+        logger.info(f"Loaded {len(self.index)} persistent cache entries from {self.path}")
+        return tags_by_key
+    
+    def _read_sync(self, key: str) -> Optional[bytes]:
+        assert self._db.conn is not None
+        row = self._db.conn.execute(
+            "SELECT value FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+    
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        if key in self._pending:
+            return self._pending[key]
+        meta = self.index.get(key)
+        if meta is None or not self._db.is_open:
+            return None
+        expires_at, _ = meta
+        if expires_at is not None and time.time() > expires_at:
+            return None
+        
+        data = await self._db.run(self._read_sync, key)
+        if data is None:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception as e:
+            # Stale pickles from an older code version are just misses
+            logger.debug(f"Dropping unreadable persistent entry {key}: {e}")
+            await self.delete(key)
+            return None
+    
+    async def set(self, key: str, value: CacheEntry, ttl: Optional[int] = None) -> None:
+        self._pending[key] = value
+        self._db.schedule_flush()
+    
+    async def delete(self, key: str) -> bool:
+        existed = key in self
+        if key in self.index:
+            _, size = self.index.pop(key)
+            self.total_bytes -= size
+        self._pending[key] = None
+        self._db.schedule_flush()
+        return existed
+    
+    async def clear(self) -> None:
+        self._pending.clear()
+        self.index.clear()
+        self.total_bytes = 0
+        if self._db.is_open:
+            await self._db.run(self._clear_sync)
+    
+    def _clear_sync(self) -> None:
+        assert self._db.conn is not None
+        self._db.conn.execute("DELETE FROM entries")
+        self._db.conn.commit()
+    
+    async def exists(self, key: str) -> bool:
+        return key in self
+    
+    def _write_sync(
+        self,
+        entries: List[Tuple[str, CacheEntry]],
+        deletes: List[Tuple[str]]
+    ) -> Dict[str, int]:
+        """Pickle and write a batch; returns the stored size of each written key"""
+        now = time.time()
+        sizes: Dict[str, int] = {}
+        upserts = []
+        for key, entry in entries:
+            try:
+                data = pickle.dumps(entry)
+            except Exception as e:
+                # Live gateway objects and the like cannot be persisted
+                logger.debug(f"Skipping unpicklable persistent entry {key}: {e}")
+                continue
+            sizes[key] = len(data)
+            upserts.append((
+                key, data, entry.expires_at, len(data), json.dumps(sorted(entry.tags)), now
+            ))
+        
+        conn = self._db.conn
+        assert conn is not None
+        if deletes:
+            conn.executemany("DELETE FROM entries WHERE key = ?", deletes)
+        if upserts:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries "
+                "(key, value, expires_at, size, tags, written_at) VALUES (?, ?, ?, ?, ?, ?)",
+                upserts
+            )
+        conn.commit()
+        return sizes
+    
+    async def flush(self) -> None:
+        """Write buffered sets and deletes to disk in one transaction"""
+        if not self._pending or not self._db.is_open:
+            return
+        pending, self._pending = self._pending, {}
+        
+        entries = [(key, entry) for key, entry in pending.items() if entry is not None]
+        deletes = [(key,) for key, entry in pending.items() if entry is None]
+        try:
+            sizes = await self._db.run(self._write_sync, entries, deletes)
+        except Exception as e:
+            logger.error(f"Failed to flush persistent cache: {e}")
+            sizes = {}
+        
+        for key, entry in entries:
+            # A newer write or delete queued meanwhile updates the index itself
+            if key not in sizes or key in self._pending:
+                continue
+            _, old_size = self.index.pop(key, (None, 0))
+            self.index[key] = (entry.expires_at, sizes[key])
+            self.total_bytes += sizes[key] - old_size
+        
+        await self._evict_to_fit()
+    
+    async def _evict_to_fit(self) -> None:
+        """Drop expired entries, then the oldest writes, until under the size cap"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        
+        now = time.time()
+        victims = [
+            key for key, (expires_at, _) in self.index.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for key in victims:
+            _, size = self.index.pop(key)
+            self.total_bytes -= size
+        
+        for key in list(self.index):
+            if self.total_bytes <= self.max_bytes:
+                break
+            _, size = self.index.pop(key)
+            self.total_bytes -= size
+            victims.append(key)
+        
+        if victims:
+            await self._db.run(self._write_sync, [], [(key,) for key in victims])
+            for key in victims:
+                self._notify_evict(key)
+    
+    def _compact_sync(self, now: float) -> None:
+        conn = self._db.conn
+        assert conn is not None
+        conn.execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+        conn.commit()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        # VACUUM rewrites the whole file, so only once enough of it is free
+        free_pages, = conn.execute("PRAGMA freelist_count").fetchone()
+        pages, = conn.execute("PRAGMA page_count").fetchone()
+        if pages and free_pages / pages >= self.VACUUM_FREE_RATIO:
+            conn.execute("VACUUM")
+            # In WAL mode the rebuilt file only replaces the old one here
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    async def compact(self) -> List[str]:
+        """Remove expired rows and reclaim disk space; returns the removed keys"""
+        if not self._db.is_open:
+            return []
+        await self.flush()
+        
+        now = time.time()
+        expired = [
+            key for key, (expires_at, _) in self.index.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for key in expired:
+            _, size = self.index.pop(key)
+            self.total_bytes -= size
+        
+        await self._db.run(self._compact_sync, now)
+        return expired
+    
+    async def close(self) -> None:
+        """Flush pending writes and close the database"""
+        await self._db.close()
+
+
+_MISSING = object()
+
+
+@dataclass
+class NamespaceConfig:
+    """Budget and defaults of one cache namespace"""
+    # The namespace's L1 quota, evicted from its own LRU segment
+    max_bytes: Optional[int] = None
+    # Applies when an entry is set without a TTL
+    default_ttl: Optional[int] = None
+    eviction_policy: EvictionPolicy = EvictionPolicy.TINY_LFU
+
+
+@dataclass(frozen=True)
+class LiveReference:
+    """Cached pointer to an object that lives in the client's gateway cache"""
+    kind: str
+    id: int
+
+
+@dataclass
+class NegativeResult:
+    """Cached failure of a lookup, re-raised to callers until it expires"""
+    error: BaseException
+    ttl: int
+
+
+class SyncMemoryTier:
+    """In-process LRU/TTL tier backing cached() on synchronous functions"""
+    
+    def __init__(self, max_entries: int = 4096):
+        # key -> (value, expires_at, tags)
+        self.data: OrderedDict[str, Tuple[Any, Optional[float], frozenset]] = OrderedDict()
+        self.max_entries = max_entries
+        self.metrics = CacheMetrics()
+        self._tag_index: Dict[str, Set[str]] = defaultdict(set)
+    
+    def get(self, key: str, default: Any = _MISSING) -> Any:
+        self.metrics.access_count += 1
+        item = self.data.get(key)
+        if item is not None:
+            value, expires_at, _ = item
+            if expires_at is None or time.time() <= expires_at:
+                self.data.move_to_end(key)
+                self.metrics.hits += 1
+                return value
+            self.delete(key)
+            self.metrics.expirations += 1
+        self.metrics.misses += 1
+        return default
+    
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        tags: Optional[Set[str]] = None
+    ) -> None:
+        self.delete(key)
+        tag_set = frozenset(tags or ())
+        self.data[key] = (value, time.time() + ttl if ttl else None, tag_set)
+        for tag in tag_set:
+            self._tag_index[tag].add(key)
+        
+        while len(self.data) > self.max_entries:
+            evicted_key = next(iter(self.data))
+            self.delete(evicted_key)
+            self.metrics.evictions += 1
+    
+    def delete(self, key: str) -> bool:
+        item = self.data.pop(key, None)
+        if item is None:
+            return False
+        for tag in item[2]:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+        return True
+    
+    def invalidate_tags(self, tags: Set[str]) -> int:
+        keys: Set[str] = set()
+        for tag in tags:
+            keys.update(self._tag_index.get(tag, ()))
+        return sum(1 for key in keys if self.delete(key))
+    
+    def clear(self) -> None:
+        self.data.clear()
+        self._tag_index.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        self.metrics.update_hit_rate()
+        return {
+            'entry_count': len(self.data),
+            'max_entries': self.max_entries,
+            'hits': self.metrics.hits,
+            'misses': self.metrics.misses,
+            'hit_rate': self.metrics.hit_rate,
+            'evictions': self.metrics.evictions,
+            'expirations': self.metrics.expirations,
+        }
+
+
 class HierarchicalCacheManager:
     """Multi-level hierarchical cache manager"""
     
-    def __init__(self):
+    # Levels consulted, in order, after an L1 miss
+    _LOWER_LEVELS: Tuple[CacheLevel, ...] = (
+        CacheLevel.L2_COMPRESSED, CacheLevel.L3_PERSISTENT
+    )
+    
+    def __init__(
+        self,
+        l1_max_bytes: int = 16 * 1024 * 1024,
+        l2_max_bytes: int = 64 * 1024 * 1024,
+        persistent_path: Optional[Union[str, Path]] = None,
+        persistent_max_bytes: int = 64 * 1024 * 1024,
+        manifest_path: Optional[Union[str, Path]] = None
+    ):
         self.levels: Dict[CacheLevel, CacheBackend] = {
-            CacheLevel.L1_MEMORY: MemoryBackend(max_size=1000),
-            CacheLevel.L2_COMPRESSED: CompressedBackend(),
+            CacheLevel.L1_MEMORY: MemoryBackend(max_bytes=l1_max_bytes),
+            CacheLevel.L2_COMPRESSED: CompressedBackend(max_bytes=l2_max_bytes),
         }
+        if persistent_path is not None:
+            self.levels[CacheLevel.L3_PERSISTENT] = PersistentBackend(
+                persistent_path, max_bytes=persistent_max_bytes
+            )
         self.metrics = CacheMetrics()
+        # Memoization tier for cached() on synchronous functions
+        self.sync_tier = SyncMemoryTier()
         self.invalidation_strategies: List[CacheInvalidationStrategy] = [
             TimeBasedInvalidation(),
             DependencyInvalidation(),
             AdaptiveInvalidation()
         ]
         self._cleanup_task: Optional[asyncio.Task] = None
-        self._stats_lock = asyncio.Lock()
+        # Deadline heap of (expires_at, key); _deadlines holds each key's
+        # current deadline so superseded heap items are skipped when popped
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._deadlines: Dict[str, float] = {}
+        self.expiry_resolution = 1.0
+        self.compaction_interval = 300
+        self.recompress_interval = 60
+        # Inverted tag index: tag -> keys, plus the reverse map to unindex keys
+        self._tag_index: Dict[str, Set[str]] = defaultdict(set)
+        self._key_tags: Dict[str, Set[str]] = {}
+        for level, backend in self.levels.items():
+            backend.on_evict = partial(self._on_evict, level)
+            if isinstance(backend, MemoryBackend):
+                backend.on_reject = self._on_reject
+        # Loads currently running, so concurrent misses share one call
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Namespaces whose entries are checksummed on write and verified on read
+        self.checksum_namespaces: Set[str] = set()
+        # Isolated namespaces, each with its own quota and counters
+        self.namespaces: Dict[str, NamespaceConfig] = {}
+        self.namespace_metrics: Dict[str, CacheMetrics] = defaultdict(CacheMetrics)
+        for name, config in self._default_namespaces(l1_max_bytes).items():
+            self.configure_namespace(name, config)
+        # How to rebuild each key cached by a warmable function, and the file
+        # the hottest of them are written to for warm-up after a restart
+        self._recipes: Dict[str, Tuple[str, Tuple]] = {}
+        self.manifest_path = Path(manifest_path) if manifest_path is not None else None
+        self.manifest_interval = 600
+        self.manifest_size = 200
+    
+    @staticmethod
+    def _default_namespaces(l1_max_bytes: int) -> Dict[str, NamespaceConfig]:
+        """Split L1 between the dashboard's features; the rest is shared"""
+        return {
+            # OAuth users and guild lists, and user lookups
+            'user': NamespaceConfig(l1_max_bytes * 3 // 8, default_ttl=1800),
+            # Guild and channel lookups
+            'guild': NamespaceConfig(l1_max_bytes // 4, default_ttl=21600),
+            # Command metadata: small and long-lived, so plain LRU is enough
+            'bot': NamespaceConfig(l1_max_bytes // 8, default_ttl=7200,
+                                   eviction_policy=EvictionPolicy.LRU),
+            # Per-user dashboard aggregates
+            'dashboard': NamespaceConfig(l1_max_bytes // 8, default_ttl=7200),
+        }
+    
+    def configure_namespace(self, name: str, config: NamespaceConfig) -> None:
+        """Create or reconfigure a namespace"""
+        self.namespaces[name] = config
+        l1_backend: MemoryBackend = self.levels[CacheLevel.L1_MEMORY]  # type: ignore
+        l1_backend.set_quota(name, config.max_bytes)
+        l1_backend.admission[name] = config.eviction_policy is EvictionPolicy.TINY_LFU
+    
+    def enable_checksums(self, namespace: str) -> None:
+        """Opt a namespace into integrity checksums"""
+        self.checksum_namespaces.add(namespace)
+    
+    def disable_checksums(self, namespace: str) -> None:
+        """Opt a namespace out of integrity checksums"""
+        self.checksum_namespaces.discard(namespace)
+    
+    def _index_tags(self, key: str, tags: Set[str]) -> None:
+        """Record the tags of a key, replacing any previously indexed ones"""
+        self._unindex_tags(key)
+        if not tags:
+            return
+        self._key_tags[key] = set(tags)
+        for tag in tags:
+            self._tag_index[tag].add(key)
+    
+    def _unindex_tags(self, key: str) -> None:
+        """Drop a key from the tag index"""
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+    
+    def _schedule_expiry(self, key: str, expires_at: Optional[float]) -> None:
+        """Track the deadline of a key, replacing any earlier one"""
+        if expires_at is None:
+            self._deadlines.pop(key, None)
+            return
+        self._deadlines[key] = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+        
+        # Rebuild once superseded items dominate, so re-set keys cannot grow the heap
+        if len(self._expiry_heap) > 2 * len(self._deadlines) + 1024:
+            self._expiry_heap = [(deadline, k) for k, deadline in self._deadlines.items()]
+            heapq.heapify(self._expiry_heap)
+    
+    def _pop_due(self, now: float) -> List[str]:
+        """Pop the keys whose deadline has passed; touches only due items"""
+        due = []
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            deadline, key = heapq.heappop(heap)
+            if self._deadlines.get(key) == deadline:
+                del self._deadlines[key]
+                due.append(key)
+        return due
+    
+    def _forget_if_gone(self, key: str) -> None:
+        """Unindex a key once no level holds it any more"""
+        if not any(key in backend for backend in self.levels.values()):
+            self._unindex_tags(key)
+            self._deadlines.pop(key, None)
+            self._recipes.pop(key, None)
+    
+    def _on_evict(self, level: CacheLevel, key: str, entry: Optional[CacheEntry] = None) -> None:
+        """Count a backend eviction, demoting live L1 entries to L2"""
+        self.metrics.evictions += 1
+        self.metrics.level_evictions[level.name] += 1
+        if entry is not None and entry.namespace is not None:
+            self.namespace_metrics[entry.namespace].evictions += 1
+        
+        if level == CacheLevel.L1_MEMORY and entry is not None and not entry.is_expired():
+            l2_backend = self.levels.get(CacheLevel.L2_COMPRESSED)
+            if isinstance(l2_backend, CompressedBackend) and l2_backend.put(key, entry):
+                self.metrics.demotions += 1
+                return
+        
+        self._forget_if_gone(key)
     
-    async def get(self, key: str) -> Optional[Any]:
+    def _on_reject(self, key: str, entry: CacheEntry) -> None:
+        """Store a key L1 admission turned away in L2 instead"""
+        l2_backend = self.levels.get(CacheLevel.L2_COMPRESSED)
+        if isinstance(l2_backend, CompressedBackend) and key in l2_backend.data:
+            # A refused promotion from L2: the copy there is already current
+            return
+        self.metrics.admission_rejections += 1
+        if isinstance(l2_backend, CompressedBackend) and l2_backend.put(key, entry):
+            return
+        self._forget_if_gone(key)
+    
+    async def get(self, key: str, namespace: Optional[str] = None) -> Optional[Any]:
         """Get value from cache with hierarchical lookup"""
-        async with self._stats_lock:
-            self.metrics.access_count += 1
+        entry = await self.get_entry(key, namespace=namespace)
+        return entry.value if entry is not None else None
+    
+    async def get_entry(
+        self, key: str, allow_stale: bool = False, namespace: Optional[str] = None
+    ) -> Optional[CacheEntry]:
+        """Get the cache entry itself; stale entries are only returned when allowed"""
+        metrics = self.metrics
+        metrics.access_count += 1
+        namespace_metrics = self.namespace_metrics[namespace] if namespace is not None else None
+        
+        # Fast path: an L1 hit completes without awaiting or locking
+        l1_backend: MemoryBackend = self.levels[CacheLevel.L1_MEMORY]  # type: ignore
+        entry = l1_backend.get_nowait(key)
+        if (entry is not None and not entry.is_expired()
+                and (allow_stale or not entry.is_stale())):
+            entry.touch()
+            metrics.hits += 1
+            if namespace_metrics is not None:
+                namespace_metrics.hits += 1
+            return entry
         
-        # Check each cache level
-        for level in [CacheLevel.L1_MEMORY, CacheLevel.L2_COMPRESSED]:
+        # Check the lower cache levels
+        for level in self._LOWER_LEVELS:
             backend = self.levels.get(level)
-            if backend:
-                entry = await backend.get(key)
-                if entry and not entry.is_expired():
-                    entry.touch()
-                    
-                    # Promote to higher cache level if not already there
-                    if level != CacheLevel.L1_MEMORY:
-                        await self._promote_entry(key, entry, level)
-                    
-                    async with self._stats_lock:
-                        self.metrics.hits += 1
-                        self.metrics.update_hit_rate()
-                    
-                    return entry.value
-        
-        async with self._stats_lock:
-            self.metrics.misses += 1
-            self.metrics.update_hit_rate()
+            if backend is None:
+                continue
+            if isinstance(backend, CompressedBackend):
+                # Metadata is stored uncompressed; only decode live entries
+                meta = backend.peek(key)
+                if meta is None or meta.is_expired() or (not allow_stale and meta.is_stale()):
+                    continue
+            entry = await backend.get(key)
+            if entry and not entry.is_expired() and (allow_stale or not entry.is_stale()):
+                # Deserialized copies are the ones worth checking for corruption
+                if not entry.verify_integrity():
+                    logger.warning(f"Integrity check failed for key {key}")
+                    await backend.delete(key)
+                    continue
+                
+                entry.touch()
+                
+                # Promote to higher cache level
+                await self._promote_entry(key, entry, level)
+                
+                metrics.hits += 1
+                if namespace_metrics is not None:
+                    namespace_metrics.hits += 1
+                return entry
         
+        metrics.misses += 1
+        if namespace_metrics is not None:
+            namespace_metrics.misses += 1
         return None
     
     async def set(
@@ -365,11 +1317,20 @@ class HierarchicalCacheManager:
         ttl: Optional[int] = None,
         priority: Priority = Priority.MEDIUM,
         tags: Optional[Set[str]] = None,
-        dependencies: Optional[Set[str]] = None
+        dependencies: Optional[Set[str]] = None,
+        namespace: Optional[str] = None,
+        stale_ttl: Optional[int] = None,
+        load_time: float = 0.0
     ) -> None:
         """Set value in cache with intelligent placement"""
+        if ttl is None and namespace in self.namespaces:
+            ttl = self.namespaces[namespace].default_ttl
         current_time = time.time()
         expires_at = current_time + ttl if ttl else None
+        fresh_until = None
+        if expires_at is not None and stale_ttl:
+            fresh_until = expires_at
+            expires_at += stale_ttl
         
         entry = CacheEntry(
             key=key,
@@ -378,14 +1339,42 @@ class HierarchicalCacheManager:
             expires_at=expires_at,
             priority=priority,
             tags=tags or set(),
-            dependencies=dependencies or set()
+            dependencies=dependencies or set(),
+            namespace=namespace,
+            fresh_until=fresh_until,
+            load_time=load_time
         )
+        if namespace is not None and namespace in self.checksum_namespaces:
+            entry.seal()
         
         # Determine appropriate cache level based on size and priority
         cache_level = self._determine_cache_level(entry)
-        backend = self.levels[cache_level]
         
-        await backend.set(key, entry, ttl)
+        self._index_tags(key, entry.tags)
+        self._schedule_expiry(key, entry.expires_at)
+        l1_backend: MemoryBackend = self.levels[CacheLevel.L1_MEMORY]  # type: ignore
+        l2_backend = self.levels.get(CacheLevel.L2_COMPRESSED)
+        if cache_level == CacheLevel.L2_COMPRESSED and isinstance(l2_backend, CompressedBackend):
+            # Values that cannot be pickled stay in L1
+            if l2_backend.put(key, entry):
+                await l1_backend.delete(key)
+            else:
+                l1_backend.put(key, entry)
+        else:
+            # Drop any older copy below so it cannot resurface after an L1 eviction
+            if l2_backend is not None:
+                await l2_backend.delete(key)
+            l1_backend.put(key, entry)
+        
+        # Write through to disk so the entry survives a restart; negative
+        # results are short-lived and their exceptions may not unpickle
+        persistent = self.levels.get(CacheLevel.L3_PERSISTENT)
+        if persistent is not None:
+            if not isinstance(value, NegativeResult):
+                await persistent.set(key, entry, ttl)
+            elif await persistent.exists(key):
+                # An older value on disk must not come back after a restart
+                await persistent.delete(key)
         
         # Add dependency tracking
         if dependencies:
@@ -397,12 +1386,86 @@ class HierarchicalCacheManager:
                 for dep in dependencies:
                     dep_strategy.add_dependency(key, dep)
     
+    async def load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        **set_options: Any
+    ) -> Any:
+        """Run ``loader`` once for concurrent misses on ``key`` and cache its result"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start_load(key, loader, set_options)
+        else:
+            self.metrics.coalesced += 1
+        return await asyncio.shield(task)
+    
+    def refresh(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        early: bool = False,
+        **set_options: Any
+    ) -> None:
+        """Reload ``key`` in the background unless a load is already running"""
+        if key in self._inflight:
+            return
+        if early:
+            self.metrics.early_refreshes += 1
+        else:
+            self.metrics.background_refreshes += 1
+        task = self._start_load(key, loader, set_options)
+        task.add_done_callback(self._count_refresh_failure)
+    
+    def _start_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        set_options: Dict[str, Any]
+    ) -> asyncio.Future:
+        task = asyncio.ensure_future(self._run_load(key, loader, set_options))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish_load(key, t))
+        return task
+    
+    async def _run_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        set_options: Dict[str, Any]
+    ) -> Any:
+        started = time.perf_counter()
+        result = await loader()
+        reference_ttl = set_options.get('reference_ttl')
+        set_options = {k: v for k, v in set_options.items() if k != 'reference_ttl'}
+        if isinstance(result, NegativeResult):
+            set_options.update(ttl=result.ttl, stale_ttl=None)
+        elif reference_ttl is not None and isinstance(result, LiveReference):
+            set_options['ttl'] = reference_ttl
+        await self.set(key, result, load_time=time.perf_counter() - started, **set_options)
+        return result
+    
+    def _finish_load(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the error as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+    
+    def _count_refresh_failure(self, task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.metrics.refresh_failures += 1
+            logger.warning(f"Background cache refresh failed: {task.exception()}")
+    
     async def delete(self, key: str) -> bool:
         """Delete from all cache levels"""
         deleted = False
         for backend in self.levels.values():
             if await backend.delete(key):
                 deleted = True
+        self._unindex_tags(key)
+        self._deadlines.pop(key, None)
+        self._recipes.pop(key, None)
         
         # Invalidate dependents
         await self._invalidate_dependents(key)
@@ -412,60 +1475,169 @@ class HierarchicalCacheManager:
     async def invalidate_by_tags(self, tags: Set[str]) -> int:
         """Invalidate all entries matching any of the given tags"""
         invalidated = 0
-        keys_to_delete = []
-        
-        for backend in self.levels.values():
-            if hasattr(backend, 'data'):
-                for key, entry_data in backend.data.items():
-                    try:
-                        if isinstance(backend, CompressedBackend):
-                            # Decompress to check tags
-                            pickled_data = zlib.decompress(entry_data)
-                            entry = pickle.loads(pickled_data)
-                        else:
-                            entry = entry_data
-                        
-                        if entry.tags.intersection(tags):
-                            keys_to_delete.append(key)
-                    except Exception as e:
-                        logger.warning(f"Error checking tags for key {key}: {e}")
+        keys_to_delete: Set[str] = set()
+        for tag in tags:
+            keys_to_delete.update(self._tag_index.get(tag, ()))
         
         for key in keys_to_delete:
             if await self.delete(key):
                 invalidated += 1
         
+        invalidated += self.sync_tier.invalidate_tags(tags)
         return invalidated
     
+    def record_recipe(self, key: str, function: str, args: Tuple) -> None:
+        """Remember the warmable call that rebuilds a key"""
+        self._recipes[key] = (function, args)
+    
+    def hot_keys(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The rebuildable keys looked up most often lately, hottest first"""
+        l1_backend: MemoryBackend = self.levels[CacheLevel.L1_MEMORY]  # type: ignore
+        frequency = l1_backend.sketch.frequency
+        hottest = heapq.nlargest(
+            limit or self.manifest_size, self._recipes.items(),
+            key=lambda item: frequency(item[0])
+        )
+        return [
+            {'key': key, 'function': function, 'args': list(args)}
+            for key, (function, args) in hottest
+        ]
+    
+    def _is_cached(self, key: str) -> bool:
+        """Whether some level holds an unexpired copy of a key; touches no stats"""
+        deadline = self._deadlines.get(key)
+        if deadline is not None and deadline <= time.time():
+            return False
+        return any(key in backend for backend in self.levels.values())
+    
+    def _write_manifest(self, manifest: List[Dict[str, Any]]) -> None:
+        assert self.manifest_path is not None
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.manifest_path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(manifest))
+        temporary.replace(self.manifest_path)
+    
+    async def save_manifest(self) -> int:
+        """Write the hot-key manifest; returns the number of keys recorded"""
+        if self.manifest_path is None:
+            return 0
+        manifest = self.hot_keys()
+        if manifest:
+            await asyncio.to_thread(self._write_manifest, manifest)
+        return len(manifest)
+    
+    async def replay_manifest(self, receiver: Any = None, concurrency: int = 8) -> int:
+        """Rebuild the manifest's keys that are no longer cached; returns how many"""
+        if self.manifest_path is None or not self.manifest_path.exists():
+            return 0
+        try:
+            manifest = json.loads(await asyncio.to_thread(self.manifest_path.read_text))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache manifest: {e}")
+            return 0
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def rebuild(function: Callable, args: List) -> None:
+            async with semaphore:
+                await function(*args)
+        
+        calls = []
+        for item in manifest:
+            rebuilder = _rebuilders.get(item.get('function'))
+            if rebuilder is None or self._is_cached(item.get('key', '')):
+                continue
+            function, is_method = rebuilder
+            args = item.get('args', [])
+            if is_method:
+                if receiver is None:
+                    continue
+                args = [receiver, *args]
+            calls.append(rebuild(function, args))
+        
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        rebuilt = sum(1 for result in results if not isinstance(result, BaseException))
+        logger.info(f"Cache manifest replayed: {rebuilt}/{len(manifest)} keys rebuilt")
+        return rebuilt
+    
     async def get_stats(self) -> Dict[str, Any]:
         """Get comprehensive cache statistics"""
-        async with self._stats_lock:
-            stats = {
-                'metrics': {
-                    'hits': self.metrics.hits,
-                    'misses': self.metrics.misses,
-                    'hit_rate': self.metrics.hit_rate,
-                    'access_count': self.metrics.access_count,
-                    'evictions': self.metrics.evictions,
-                },
-                'memory_usage': {},
-                'level_stats': {}
+        # Counters are plain integers; the hit rate is derived on read
+        self.metrics.update_hit_rate()
+        stats = {
+            'metrics': {
+                'hits': self.metrics.hits,
+                'misses': self.metrics.misses,
+                'hit_rate': self.metrics.hit_rate,
+                'access_count': self.metrics.access_count,
+                'evictions': self.metrics.evictions,
+                'coalesced': self.metrics.coalesced,
+                'negative_hits': self.metrics.negative_hits,
+                'reference_hits': self.metrics.reference_hits,
+                'dangling_references': self.metrics.dangling_references,
+                'expirations': self.metrics.expirations,
+                'demotions': self.metrics.demotions,
+                'admission_rejections': self.metrics.admission_rejections,
+                'level_evictions': dict(self.metrics.level_evictions),
+            },
+            'refreshes': {
+                'stale_hits': self.metrics.stale_hits,
+                'background': self.metrics.background_refreshes,
+                'early': self.metrics.early_refreshes,
+                'failures': self.metrics.refresh_failures,
+            },
+            'memory_usage': {},
+            'level_stats': {},
+            'pending_expiries': len(self._deadlines),
+            'sync_tier': self.sync_tier.stats(),
+            'namespaces': {},
+            'tag_index': {
+                'tags': len(self._tag_index),
+                'keys': len(self._key_tags),
             }
+        }
         
-        # Get per-level statistics
+        # Per-level statistics come from running totals kept on set, delete
+        # and evict, so this stays O(levels) however much is cached
+        total_memory = 0
         for level, backend in self.levels.items():
-            if hasattr(backend, 'data'):
-                entry_count = len(backend.data)
-                memory_usage = sum(
-                    len(pickle.dumps(entry)) if not isinstance(backend, CompressedBackend)
-                    else len(entry_data)
-                    for entry_data in backend.data.values()
-                )
-                
+            if isinstance(backend, PersistentBackend):
                 stats['level_stats'][level.name] = {
-                    'entry_count': entry_count,
-                    'memory_usage': memory_usage
+                    'entry_count': len(backend.index),
+                    'disk_usage': backend.total_bytes,
+                    'max_bytes': backend.max_bytes,
+                    'pending_writes': len(backend._pending),
                 }
-                stats['memory_usage'][level.name] = memory_usage
+                continue
+            
+            memory_usage = getattr(backend, 'total_bytes', 0)
+            stats['level_stats'][level.name] = {
+                'entry_count': len(getattr(backend, 'data', ())),
+                'memory_usage': memory_usage,
+                'max_bytes': getattr(backend, 'max_bytes', None),
+            }
+            if isinstance(backend, MemoryBackend):
+                stats['level_stats'][level.name]['admission_rejections'] = backend.rejections
+            elif isinstance(backend, CompressedBackend):
+                stats['level_stats'][level.name]['recompressed'] = backend.recompressed
+            stats['memory_usage'][level.name] = memory_usage
+            total_memory += memory_usage
+        self.metrics.memory_usage = total_memory
+        stats['metrics']['memory_usage'] = total_memory
+        
+        l1_backend: MemoryBackend = self.levels[CacheLevel.L1_MEMORY]  # type: ignore
+        for name, config in self.namespaces.items():
+            namespace_metrics = self.namespace_metrics[name]
+            namespace_metrics.update_hit_rate()
+            stats['namespaces'][name] = {
+                'hits': namespace_metrics.hits,
+                'misses': namespace_metrics.misses,
+                'hit_rate': namespace_metrics.hit_rate,
+                'evictions': namespace_metrics.evictions,
+                'memory_usage': l1_backend.namespace_bytes.get(name, 0),
+                'max_bytes': config.max_bytes,
+                'eviction_policy': config.eviction_policy.value,
+            }
         
         return stats
     
@@ -473,7 +1645,7 @@ class HierarchicalCacheManager:
         """Determine optimal cache level for entry"""
         if entry.priority in [Priority.CRITICAL, Priority.HIGH]:
             return CacheLevel.L1_MEMORY
-        elif entry.size > 10000:  # Large entries go to compressed cache
+        elif entry.estimate() > 10000:  # Large entries go to compressed cache
             return CacheLevel.L2_COMPRESSED
         else:
             return CacheLevel.L1_MEMORY
@@ -483,6 +1655,9 @@ class HierarchicalCacheManager:
         if current_level == CacheLevel.L2_COMPRESSED:
             l1_backend = self.levels[CacheLevel.L1_MEMORY]
             await l1_backend.set(key, entry)
+        elif current_level == CacheLevel.L3_PERSISTENT:
+            target = self._determine_cache_level(entry)
+            await self.levels[target].set(key, entry)
     
     async def _invalidate_dependents(self, key: str):
         """Invalidate all entries that depend on the given key"""
@@ -498,6 +1673,16 @@ class HierarchicalCacheManager:
     
     async def start_background_tasks(self):
         """Start background maintenance tasks"""
+        persistent = self.levels.get(CacheLevel.L3_PERSISTENT)
+        if isinstance(persistent, PersistentBackend):
+            try:
+                for key, tags in (await persistent.open()).items():
+                    self._index_tags(key, tags)
+                for key, (expires_at, _) in persistent.index.items():
+                    self._schedule_expiry(key, expires_at)
+            except Exception as e:
+                logger.error(f"Failed to open persistent cache, disabling L3: {e}")
+                del self.levels[CacheLevel.L3_PERSISTENT]
         self._cleanup_task = asyncio.create_task(self._cleanup_expired())
     
     async def stop_background_tasks(self):
@@ -508,49 +1693,53 @@ class HierarchicalCacheManager:
                 await self._cleanup_task
             except asyncio.CancelledError:
                 pass
+        try:
+            await self.save_manifest()
+        except Exception as e:
+            logger.warning(f"Failed to save cache manifest: {e}")
+        persistent = self.levels.get(CacheLevel.L3_PERSISTENT)
+        if isinstance(persistent, PersistentBackend):
+            await persistent.close()
     
     async def _cleanup_expired(self):
-        """Background task to clean up expired entries"""
+        """Background task that removes entries close to their real deadline"""
+        last_compaction = last_manifest = last_recompress = time.monotonic()
         while True:
             try:
-                await asyncio.sleep(300)  # Run every 5 minutes
+                now = time.time()
+                delay = self.expiry_resolution
+                if self._expiry_heap:
+                    delay = min(delay, max(self._expiry_heap[0][0] - now, 0.0))
+                await asyncio.sleep(delay)
                 
-                keys_to_delete = []
-                context = {'invalidated_keys': set()}
+                expired = self._pop_due(time.time())
+                for key in expired:
+                    await self.delete(key)
+                self.metrics.expirations += len(expired)
+                self.metrics.evictions += len(expired)
                 
-                for backend in self.levels.values():
-                    if hasattr(backend, 'data'):
-                        for key, entry_data in list(backend.data.items()):
-                            try:
-                                if isinstance(backend, CompressedBackend):
-                                    pickled_data = zlib.decompress(entry_data)
-                                    entry = pickle.loads(pickled_data)
-                                else:
-                                    entry = entry_data
-                                
-                                # Check all invalidation strategies
-                                should_invalidate = False
-                                for strategy in self.invalidation_strategies:
-                                    if await strategy.should_invalidate(entry, context):
-                                        should_invalidate = True
-                                        break
-                                
-                                if should_invalidate:
-                                    keys_to_delete.append(key)
-                                    context['invalidated_keys'].add(key)
-                            
-                            except Exception as e:
-                                logger.warning(f"Error during cleanup for key {key}: {e}")
-                                keys_to_delete.append(key)  # Remove corrupted entries
+                # Reclaim disk space now and then
+                persistent = self.levels.get(CacheLevel.L3_PERSISTENT)
+                if (isinstance(persistent, PersistentBackend)
+                        and time.monotonic() - last_compaction >= self.compaction_interval):
+                    last_compaction = time.monotonic()
+                    for key in await persistent.compact():
+                        self._forget_if_gone(key)
                 
-                # Delete expired/invalid entries
-                for key in keys_to_delete:
-                    await self.delete(key)
-                    async with self._stats_lock:
-                        self.metrics.evictions += 1
+                # Densely recompress L2 entries nobody has read in a while
+                compressed = self.levels.get(CacheLevel.L2_COMPRESSED)
+                if (isinstance(compressed, CompressedBackend)
+                        and time.monotonic() - last_recompress >= self.recompress_interval):
+                    last_recompress = time.monotonic()
+                    await compressed.recompress_cold()
                 
-                if keys_to_delete:
-                    logger.info(f"Cleaned up {len(keys_to_delete)} cache entries")
+                # Record what is hot so a restart can warm it back up
+                if time.monotonic() - last_manifest >= self.manifest_interval:
+                    last_manifest = time.monotonic()
+                    await self.save_manifest()
+                
+                if expired:
+                    logger.debug(f"Expired {len(expired)} cache entries")
             
             except asyncio.CancelledError:
                 break
@@ -559,7 +1748,7 @@ class HierarchicalCacheManager:
 
 
 def cache_key_generator(*args, **kwargs) -> str:
-    """Generate a consistent cache key from function arguments"""
+    """Generate a consistent cache key from function arguments (legacy string hashing)"""
     key_parts = []
     
     # Add positional arguments
@@ -578,79 +1767,238 @@ def cache_key_generator(*args, **kwargs) -> str:
     return hashlib.sha256(key_string.encode()).hexdigest()
 
 
+_KEY_SCALARS = frozenset({int, str, float, bool, type(None)})
+
+
+def _key_part(arg: Any) -> Any:
+    """Reduce one argument to a hashable, stable key component"""
+    if type(arg) in _KEY_SCALARS:
+        return arg
+    identity = getattr(arg, '__cache_key__', None)
+    if identity is not None:
+        return identity() if callable(identity) else identity
+    if isinstance(arg, Enum):
+        return (type(arg).__qualname__, arg.value)
+    if isinstance(arg, (tuple, list)):
+        return tuple(_key_part(item) for item in arg)
+    if isinstance(arg, (set, frozenset)):
+        return tuple(sorted((_key_part(item) for item in arg), key=repr))
+    if isinstance(arg, dict):
+        return tuple(sorted(((k, _key_part(v)) for k, v in arg.items()), key=repr))
+    if type(arg).__repr__ is object.__repr__:
+        # The default repr is the object's address, which CPython reuses
+        # once the object is freed and which means nothing after a restart
+        raise TypeError(
+            f"Cannot build a cache key from {type(arg).__qualname__}; give it a "
+            f"__cache_key__ or pass key_generator to cached()"
+        )
+    return repr(arg)
+
+
+def _receiver_part(receiver: Any) -> Any:
+    """Key component for a method's ``self``, by identity without ``__cache_key__``"""
+    if hasattr(receiver, '__cache_key__') or not hasattr(receiver, '__dict__'):
+        return _key_part(receiver)
+    return (type(receiver).__qualname__, id(receiver))
+
+
+def structural_key(*args, **kwargs) -> Tuple:
+    """Build a tuple key from function arguments without stringifying objects"""
+    parts = tuple(arg if type(arg) in _KEY_SCALARS else _key_part(arg) for arg in args)
+    if kwargs:
+        parts += tuple((k, _key_part(v)) for k, v in sorted(kwargs.items()))
+    return parts
+
+
+def _method_key(*args, **kwargs) -> Tuple:
+    """``structural_key`` for methods, with the receiver keyed by ``_receiver_part``"""
+    return (_receiver_part(args[0]),) + structural_key(*args[1:], **kwargs)
+
+
+# Warmable cached() functions by name, and whether they are called on a receiver
+_rebuilders: Dict[str, Tuple[Callable, bool]] = {}
+
+
 def cached(
     ttl: Optional[int] = 3600,
     priority: Priority = Priority.MEDIUM,
     tags: Optional[Set[str]] = None,
     dependencies: Optional[Set[str]] = None,
-    key_generator: Optional[Callable] = None
+    # Defaults to the arguments' structural key; objects other than a
+    # method's self need a __cache_key__ or this, else the call raises TypeError
+    key_generator: Optional[Callable] = None,
+    namespace: Optional[str] = None,
+    # STALE_WHILE_REVALIDATE serves an expired value for up to max_stale
+    # seconds (default ttl) while reloading it; EARLY reloads before expiry
+    refresh_mode: RefreshMode = RefreshMode.NONE,
+    max_stale: Optional[int] = None,
+    early_refresh_beta: float = 1.0,
+    # Per-call tags such as guild:{id}
+    key_tags: Optional[Callable[..., Set[str]]] = None,
+    # Errors negative_on accepts are cached for negative_ttl and re-raised
+    negative_ttl: Optional[int] = None,
+    negative_on: Optional[Callable[[BaseException], bool]] = None,
+    # Maps a returned LiveReference back to the live object; references are
+    # kept for reference_ttl, plain values for ttl
+    resolve: Optional[Callable[..., Any]] = None,
+    reference_ttl: Optional[int] = None,
+    # JSON-serializable arguments (without self) that rebuild the key, or
+    # None; hot keys are saved to the manifest and replayed after a restart
+    warm_args: Optional[Callable[..., Optional[Tuple]]] = None
 ):
     """Advanced caching decorator with comprehensive features"""
+    stale_ttl = None
+    if refresh_mode is RefreshMode.STALE_WHILE_REVALIDATE:
+        stale_ttl = max_stale if max_stale is not None else ttl
+    elif refresh_mode is RefreshMode.EARLY:
+        stale_ttl = max_stale
+    
     def decorator(func: Callable) -> Callable:
+        function_name = f"{func.__module__}.{func.__qualname__}"
+        key_prefix = f"{function_name}:"
+        is_method = list(inspect.signature(func).parameters)[:1] == ['self']
+        default_key = _method_key if is_method else structural_key
+        
+        def record_recipe(cache_key: str, value: Any, args: Tuple, kwargs: Dict[str, Any]) -> None:
+            # Failures are not worth warming up again
+            if warm_args is not None and not isinstance(value, NegativeResult):
+                recipe = warm_args(*args, **kwargs)
+                if recipe is not None:
+                    cache_manager.record_recipe(cache_key, function_name, tuple(recipe))
+        
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
             # Generate cache key
             if key_generator:
-                cache_key = key_generator(*args, **kwargs)
+                cache_key = f"{key_prefix}{key_generator(*args, **kwargs)}"
             else:
-                func_name = f"{func.__module__}.{func.__qualname__}"
-                cache_key = f"{func_name}:{cache_key_generator(*args, **kwargs)}"
+                cache_key = f"{key_prefix}{default_key(*args, **kwargs)!r}"
             
-            # Try to get from cache
-            cached_value = await cache_manager.get(cache_key)
-            if cached_value is not None:
-                return cached_value
+            async def loader():
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    if negative_ttl and negative_on is not None and negative_on(e):
+                        return NegativeResult(e, negative_ttl)
+                    raise
             
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            await cache_manager.set(
-                cache_key, result, ttl=ttl, priority=priority,
-                tags=tags, dependencies=dependencies
+            call_tags = tags
+            if key_tags is not None:
+                call_tags = (tags or set()) | key_tags(*args, **kwargs)
+            set_options = dict(
+                ttl=ttl, priority=priority, tags=call_tags, dependencies=dependencies,
+                namespace=namespace, stale_ttl=stale_ttl, reference_ttl=reference_ttl
             )
-            return result
+            
+            # Try to get from cache
+            value = None
+            if refresh_mode is RefreshMode.NONE:
+                value = await cache_manager.get(cache_key, namespace=namespace)
+            else:
+                entry = await cache_manager.get_entry(
+                    cache_key, allow_stale=True, namespace=namespace
+                )
+                if entry is not None and entry.value is not None:
+                    if entry.is_stale():
+                        cache_manager.metrics.stale_hits += 1
+                        cache_manager.refresh(cache_key, loader, **set_options)
+                    elif (refresh_mode is RefreshMode.EARLY
+                            and entry.should_refresh_early(early_refresh_beta)):
+                        cache_manager.refresh(cache_key, loader, early=True, **set_options)
+                    value = entry.value
+            
+            if value is None:
+                # Execute function and cache result, sharing one call per key
+                value = await cache_manager.load(cache_key, loader, **set_options)
+                record_recipe(cache_key, value, args, kwargs)
+            elif isinstance(value, NegativeResult):
+                cache_manager.metrics.negative_hits += 1
+            elif isinstance(value, LiveReference) and resolve is not None:
+                resolved = resolve(value, *args, **kwargs)
+                if resolved is not None:
+                    cache_manager.metrics.reference_hits += 1
+                    return resolved
+                # The object left the client cache; load it again
+                cache_manager.metrics.dangling_references += 1
+                await cache_manager.delete(cache_key)
+                value = await cache_manager.load(cache_key, loader, **set_options)
+                record_recipe(cache_key, value, args, kwargs)
+            
+            if isinstance(value, NegativeResult):
+                raise value.error.with_traceback(None)
+            if isinstance(value, LiveReference) and resolve is not None:
+                return resolve(value, *args, **kwargs)
+            return value
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            # For sync functions, we need to handle caching differently
-            # This is a simplified version - in practice, you might want
-            # to use a separate sync cache manager
-            return func(*args, **kwargs)
+            # Sync callers cannot await the hierarchy, so they use the sync tier
+            if key_generator:
+                cache_key = f"{key_prefix}{key_generator(*args, **kwargs)}"
+            else:
+                cache_key = f"{key_prefix}{default_key(*args, **kwargs)!r}"
+            
+            sync_tier = cache_manager.sync_tier
+            cached_value = sync_tier.get(cache_key)
+            if cached_value is not _MISSING:
+                return cached_value
+            
+            result = func(*args, **kwargs)
+            call_tags = tags
+            if key_tags is not None:
+                call_tags = (tags or set()) | key_tags(*args, **kwargs)
+            sync_tier.set(cache_key, result, ttl=ttl, tags=call_tags)
+            return result
         
-        return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
+        if not asyncio.iscoroutinefunction(func):
+            return sync_wrapper
+        if warm_args is not None:
+            _rebuilders[function_name] = (async_wrapper, is_method)
+        return async_wrapper
     
     return decorator
 
 
 # Global cache manager instance
-cache_manager = HierarchicalCacheManager()
+cache_manager = HierarchicalCacheManager(
+    persistent_path="Data/Cache/dashboard_cache.db",
+    manifest_path="Data/Cache/hot_keys.json"
+)
+
+
+def token_key(backend: "APIServer", access_token: str, *args: Any) -> str:
+    """Key OAuth lookups by a digest so raw access tokens never appear in keys"""
+    digest = hashlib.blake2b(access_token.encode(), digest_size=16).hexdigest()
+    return f"{digest}:{structural_key(*args)!r}" if args else digest
 
 
 # Enhanced versions of your original functions
-@cached(ttl=3600, priority=Priority.HIGH, tags={"discord", "guilds"})
+@cached(
+    ttl=3600, priority=Priority.HIGH, tags={"discord", "guilds"},
+    refresh_mode=RefreshMode.EARLY, key_generator=token_key, namespace="user"
+)
 async def get_cached_guilds(backend: "APIServer", access_token: str) -> List[Guild]:
     """Enhanced guild caching with intelligent invalidation"""
-    oauth_token = OAuth2Token({
-        "access_token": access_token,
-        "token_type": "Bearer",
-    })
-    session = OAuth2Session(backend.oauth_client, oauth_token)
+    session = backend.get_oauth_session(access_token)
     guilds = await session.fetch_guilds()
     return guilds
 
 
-@cached(ttl=1800, priority=Priority.HIGH, tags={"discord", "user"})
+@cached(
+    ttl=1800, priority=Priority.HIGH, tags={"discord", "user"},
+    key_generator=token_key, namespace="user"
+)
 async def get_cached_user(backend: "APIServer", access_token: str) -> User:
     """Enhanced user caching with dependency tracking"""
-    oauth_token = OAuth2Token({
-        "access_token": access_token,
-        "token_type": "Bearer",
-    })
-    session = OAuth2Session(backend.oauth_client, oauth_token)
+    session = backend.get_oauth_session(access_token)
     user = await session.fetch_user()
     return user
 
 
-@cached(ttl=7200, priority=Priority.MEDIUM, tags={"dashboard", "user_stats"})
+@cached(
+    ttl=7200, priority=Priority.MEDIUM, tags={"dashboard", "user_stats"},
+    key_generator=token_key, namespace="dashboard"
+)
 async def get_cached_user_dashboard(
     backend: "APIServer", 
     access_token: str, 
@@ -707,7 +2055,8 @@ class CacheIntegration:
             user_data, 
             ttl=1800,  # 30 minutes
             priority=Priority.HIGH,
-            tags={"discord", "user"}
+            tags={"discord", "user"},
+            namespace="user"
         ))
 
 # Create cache integration instance
@@ -718,12 +2067,25 @@ __all__ = [
     'cache_manager',
     'cache_integration',
     'cached',
+    'structural_key',
     'get_cached_guilds',
     'get_cached_user',
     'get_cached_user_dashboard',
     'cache_transaction',
     'warm_cache',
     'Priority',
+    'RefreshMode',
+    'EvictionPolicy',
+    'NamespaceConfig',
+    'NegativeResult',
+    'LiveReference',
     'CacheStrategy',
-    'HierarchicalCacheManager'
+    'HierarchicalCacheManager',
+    'PersistentBackend',
+    'Codec',
+    'ZlibCodec',
+    'LzmaCodec',
+    'SyncMemoryTier',
+    'FrequencySketch',
+    'estimate_size'
 ]
\ No newline at end of file
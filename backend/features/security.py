@@ -1,12 +1,129 @@
 from __future__ import annotations
 
+import hashlib
 import time
-from typing import Callable, Dict, Optional, Any
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Any
 from functools import wraps
 from fastapi import Request, Depends
+from jose import JWTError, jwt
 from .errors import AuthenticationError, AuthorizationError, RateLimitError
 from nexon.OAuth2 import OAuth2Session
 
+@dataclass
+class AuthContext:
+    """The caller of one HTTP request, kept on ``request.state.auth``"""
+    access_token: str
+    user: Dict[str, Any]
+    guilds: Optional[List[Dict[str, Any]]] = None
+    
+    @property
+    def user_id(self) -> int:
+        return int(self.user["id"])
+
+
+class SessionTokenSigner:
+    """Issues and verifies the dashboard's signed session tokens
+
+    A token is a short-lived HS256 JWT with the user object as ``/users/@me``
+    returned it and a digest of the Discord access token it was issued for,
+    so it is only accepted next to that same ``accessToken`` cookie.
+    Verifying one needs no network I/O.
+    Guild permissions are not carried: admin checks read the gateway's
+    member cache, which is current and free.
+    """
+    
+    algorithm = "HS256"
+    
+    def __init__(self, secret: str, ttl: int = 900):
+        # Never sign with the raw client secret itself
+        self.key = hashlib.sha256(f"negomi-dashboard-session:{secret}".encode()).hexdigest()
+        self.ttl = ttl
+    
+    @staticmethod
+    def _session_id(access_token: str) -> str:
+        return hashlib.blake2b(access_token.encode(), digest_size=16).hexdigest()
+    
+    def issue(self, access_token: str, user: Dict[str, Any]) -> str:
+        now = int(time.time())
+        claims = {
+            "sub": str(user["id"]),
+            # The whole object, so a verified token yields the same user
+            # shape as a refresh from Discord
+            "user": dict(user),
+            "sid": self._session_id(access_token),
+            "iat": now,
+            "exp": now + self.ttl,
+        }
+        return jwt.encode(claims, self.key, algorithm=self.algorithm)
+    
+    def verify(self, token: str, access_token: str) -> Optional[AuthContext]:
+        """The auth context a valid token carries, or None to fall back to Discord"""
+        try:
+            claims = jwt.decode(token, self.key, algorithms=[self.algorithm])
+        except JWTError:
+            return None
+        if claims.get("sid") != self._session_id(access_token):
+            return None
+        return AuthContext(access_token=access_token, user=claims["user"])
+
+
+class SlidingWindowLimiter:
+    """O(1) sliding-window-counter rate limiter
+
+    Each key keeps only the request counts of the current and the previous
+    fixed window; the previous count is weighted by how much of it still
+    overlaps the sliding window. Keys idle for two windows carry no state
+    worth keeping and are evicted as other keys are checked.
+    """
+    
+    def __init__(self, max_requests: int, per_seconds: float = 60):
+        self.max_requests = max_requests
+        self.window = per_seconds
+        # key -> [window start, previous window count, current window count],
+        # ordered by last use so idle keys collect at the front
+        self._counters: OrderedDict[str, List[float]] = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._counters)
+    
+    def allow(self, key: str, now: Optional[float] = None) -> bool:
+        """Count a request for a key; False if it is over the limit"""
+        if now is None:
+            now = time.monotonic()
+        window = self.window
+        start = now - now % window
+        
+        counters = self._counters
+        counter = counters.get(key)
+        if counter is None:
+            counter = counters[key] = [start, 0, 0]
+        else:
+            counters.move_to_end(key)
+            elapsed = start - counter[0]
+            if elapsed >= 2 * window:
+                counter[:] = [start, 0, 0]
+            elif elapsed >= window:
+                counter[:] = [start, counter[2], 0]
+        
+        # Forget keys whose last window is too old to count
+        while counters:
+            idle_key = next(iter(counters))
+            if start - counters[idle_key][0] < 2 * window:
+                break
+            del counters[idle_key]
+        
+        overlap = 1 - (now - start) / window
+        if counter[1] * overlap + counter[2] >= self.max_requests:
+            return False
+        counter[2] += 1
+        return True
+    
+    def clear(self) -> None:
+        self._counters.clear()
+
+
 def require_auth(func: Callable) -> Callable:
     """Decorator to require authentication for routes"""
     @wraps(func)
@@ -44,31 +161,14 @@ def rate_limit(
 ) -> Callable:
     """Decorator for route-specific rate limiting"""
     def decorator(func: Callable) -> Callable:
-        # Store rate limit state
-        state: Dict[str, list[float]] = {}
+        limiter = SlidingWindowLimiter(max_requests, per_seconds)
         
         @wraps(func)
         async def wrapper(request: Request, *args, **kwargs):
-            # Implement per-route rate limiting here
             client_ip = request.client.host if request.client else "unknown"
-            now = time.time()
-            
-            # Clean old requests
-            if client_ip in state:
-                state[client_ip] = [
-                    req_time for req_time in state[client_ip]
-                    if now - req_time < per_seconds
-                ]
-            
-            # Check rate limit
-            if client_ip in state and len(state[client_ip]) >= max_requests:
+            if not limiter.allow(client_ip):
                 raise RateLimitError()
-                
-            # Add request
-            if client_ip not in state:
-                state[client_ip] = []
-            state[client_ip].append(now)
             
             return await func(request, *args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
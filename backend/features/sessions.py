@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from nexon.OAuth2 import OAuth2Client, OAuth2Session, OAuth2Token
+
+logger = logging.getLogger(__name__)
+
+# Discord access tokens last a week unless the token response says otherwise
+DEFAULT_TOKEN_TTL = 7 * 24 * 3600
+_TOKEN_FIELDS = ("access_token", "token_type", "expires_in", "refresh_token", "scope")
+
+
+def _token_data(token: Any) -> Dict[str, Any]:
+    """The fields needed to rebuild an OAuth2Token"""
+    if isinstance(token, dict):
+        return {k: token[k] for k in _TOKEN_FIELDS if token.get(k) is not None}
+    data = {k: getattr(token, k, None) for k in _TOKEN_FIELDS}
+    return {k: v for k, v in data.items() if v is not None}
+
+
+class OAuthSessionStore:
+    """Bounded, expiring map of access token to OAuth2Session
+
+    Sessions expire with their token's ``expires_in`` and the least recently
+    used ones are dropped beyond ``max_sessions``. With ``persist_path`` the
+    live sessions are saved on shutdown and restored on startup, so a
+    redeploy does not log everyone out. The file holds access tokens and is
+    written readable by the owner only.
+    """
+
+    def __init__(
+        self,
+        client: OAuth2Client,
+        max_sessions: int = 5000,
+        default_ttl: int = DEFAULT_TOKEN_TTL,
+        persist_path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.client = client
+        self.max_sessions = max_sessions
+        self.default_ttl = default_ttl
+        self.persist_path = Path(persist_path) if persist_path is not None else None
+        # access token -> (session, token data, expires at)
+        self._sessions: OrderedDict[str, Tuple[OAuth2Session, Dict[str, Any], float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, access_token: object) -> bool:
+        return self.get(access_token) is not None  # type: ignore[arg-type]
+
+    def __getitem__(self, access_token: str) -> OAuth2Session:
+        session = self.get(access_token)
+        if session is None:
+            raise KeyError(access_token)
+        return session
+
+    def __setitem__(self, access_token: str, session: OAuth2Session) -> None:
+        self.put(access_token, session)
+
+    def __delitem__(self, access_token: str) -> None:
+        del self._sessions[access_token]
+
+    def get(self, access_token: str, default: Optional[OAuth2Session] = None) -> Optional[OAuth2Session]:
+        """Look up a live session, dropping it if its token has expired"""
+        item = self._sessions.get(access_token)
+        if item is None:
+            return default
+        session, _, expires_at = item
+        if expires_at <= time.time():
+            del self._sessions[access_token]
+            return default
+        self._sessions.move_to_end(access_token)
+        return session
+
+    def put(
+        self,
+        access_token: str,
+        session: OAuth2Session,
+        token: Optional[OAuth2Token] = None,
+    ) -> None:
+        """Store a session; its lifetime comes from ``token.expires_in`` when known"""
+        data = _token_data(token) if token is not None else {}
+        data.setdefault("access_token", access_token)
+        data.setdefault("token_type", "Bearer")
+        expires_in = data.get("expires_in") or self.default_ttl
+        self._store(access_token, session, data, time.time() + int(expires_in))
+
+    def _store(
+        self, access_token: str, session: OAuth2Session, data: Dict[str, Any], expires_at: float
+    ) -> None:
+        self._sessions[access_token] = (session, data, expires_at)
+        self._sessions.move_to_end(access_token)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def pop(self, access_token: str, default: Optional[OAuth2Session] = None) -> Optional[OAuth2Session]:
+        item = self._sessions.pop(access_token, None)
+        return item[0] if item is not None else default
+
+    def prune(self) -> int:
+        """Drop every expired session; returns how many were dropped"""
+        now = time.time()
+        expired = [token for token, (_, _, expires_at) in self._sessions.items() if expires_at <= now]
+        for access_token in expired:
+            del self._sessions[access_token]
+        return len(expired)
+
+    def clear(self) -> None:
+        self._sessions.clear()
+
+    def _write(self, records: list) -> None:
+        assert self.persist_path is not None
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.persist_path.with_suffix(".tmp")
+        fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as file:
+            json.dump(records, file)
+        temporary.replace(self.persist_path)
+
+    async def save(self) -> int:
+        """Persist the live sessions; returns how many were written"""
+        if self.persist_path is None:
+            return 0
+        self.prune()
+        records = [
+            {"token": data, "expires_at": expires_at}
+            for _, data, expires_at in self._sessions.values()
+        ]
+        await asyncio.to_thread(self._write, records)
+        return len(records)
+
+    async def load(self) -> int:
+        """Restore persisted sessions that have not expired yet"""
+        if self.persist_path is None or not self.persist_path.exists():
+            return 0
+        try:
+            records = json.loads(await asyncio.to_thread(self.persist_path.read_text))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable OAuth session file: {e}")
+            return 0
+
+        now = time.time()
+        restored = 0
+        for record in records:
+            data, expires_at = record.get("token") or {}, record.get("expires_at", 0)
+            access_token = data.get("access_token")
+            if not access_token or expires_at <= now:
+                continue
+            session = OAuth2Session(self.client, OAuth2Token(data))
+            self._store(access_token, session, data, expires_at)
+            restored += 1
+        return restored
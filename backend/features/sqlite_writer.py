@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, TypeVar, Union
+
+T = TypeVar("T")
+
+
+class SQLiteBatchWriter:
+    """One WAL-mode SQLite connection used only from a single worker thread
+
+    Owners buffer writes in memory and call ``schedule_flush``; their ``flush``
+    then runs once per ``flush_delay`` and must skip the database until open.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        flush: Callable[[], Awaitable[Any]],
+        flush_delay: float = 1.0,
+        thread_name: str = "sqlite",
+    ) -> None:
+        self.path = Path(path)
+        self.flush = flush
+        self.flush_delay = flush_delay
+        self.conn: Optional[sqlite3.Connection] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=thread_name)
+
+    @property
+    def is_open(self) -> bool:
+        return self.conn is not None
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _open_sync(self, setup: Callable[[sqlite3.Connection], T]) -> T:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            result = setup(conn)
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        self.conn = conn
+        return result
+
+    async def open(self, setup: Callable[[sqlite3.Connection], T]) -> T:
+        """Connect and run ``setup`` (schema, initial reads) on the worker"""
+        return await self.run(self._open_sync, setup)
+
+    def schedule_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def close(self) -> None:
+        """Flush pending writes and close the connection"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        if self.conn is not None:
+            conn, self.conn = self.conn, None
+            await self.run(conn.close)
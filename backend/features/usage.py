@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from backend.features.sqlite_writer import SQLiteBatchWriter
+
+logger = logging.getLogger(__name__)
+
+# seeded_guilds row marking the global (command, day) counters as backfilled;
+# Discord snowflakes are never 0
+GLOBAL_SCOPE = 0
+
+
+class CommandUsageStore:
+    """Pre-aggregated command usage counters in a small SQLite database
+
+    Writers only bump in-memory counters, flushed once per ``flush_delay``;
+    per-user counts are flushed to nexon's UserData instead.
+    """
+
+    # Users read and written per query when flushing per-user history
+    USER_BATCH = 500
+
+    def __init__(
+        self,
+        path: Union[str, Path] = "Data/Cache/command_usage.db",
+        flush_delay: float = 1.0,
+    ) -> None:
+        # Guilds whose history is in the table; None until the store is open.
+        # Live counts of a scope are only kept once its one-off backfill from
+        # nexon's history is done, since the backfill already includes them
+        self._seeded: Optional[Set[int]] = None
+        self._pending: Counter[Tuple[int, str]] = Counter()
+        # (command, day number) -> uses, and command -> last use timestamp
+        self._daily: Counter[Tuple[str, int]] = Counter()
+        self._last_used: Dict[str, float] = {}
+        # user ID -> (command -> uses, command -> last use timestamp)
+        self._users: Dict[int, Tuple[Counter[str], Dict[str, float]]] = {}
+        self._users_lock = asyncio.Lock()
+        self._seeding: Dict[int, asyncio.Task] = {}
+        self._db = SQLiteBatchWriter(path, self.flush, flush_delay, thread_name="command-usage")
+
+    @property
+    def path(self) -> Path:
+        return self._db.path
+
+    @staticmethod
+    def _setup_sync(conn: sqlite3.Connection) -> List[Tuple[int]]:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS guild_command_usage ("
+            "guild_id INTEGER NOT NULL, command TEXT NOT NULL, "
+            "uses INTEGER NOT NULL, PRIMARY KEY (guild_id, command)) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS command_usage_daily ("
+            "command TEXT NOT NULL, day INTEGER NOT NULL, uses INTEGER NOT NULL, "
+            "last_used REAL, PRIMARY KEY (command, day)) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS seeded_guilds (guild_id INTEGER PRIMARY KEY)"
+        )
+        return conn.execute("SELECT guild_id FROM seeded_guilds").fetchall()
+
+    async def open(self) -> None:
+        if self._db.is_open:
+            return
+        rows = await self._db.open(self._setup_sync)
+        self._seeded = {guild_id for guild_id, in rows}
+        # Counts recorded before opening only stand for backfilled guilds
+        for key in [key for key in self._pending if key[0] not in self._seeded]:
+            del self._pending[key]
+        if GLOBAL_SCOPE not in self._seeded:
+            self._daily.clear()
+            self._last_used.clear()
+        if self._pending or self._daily:
+            self._db.schedule_flush()
+
+    async def close(self) -> None:
+        await self._db.close()
+
+    def record(self, guild_id: int, command: str, count: int = 1) -> None:
+        """Count a command use towards a guild; global counts go through ``track``"""
+        if self._seeded is not None and guild_id not in self._seeded:
+            return
+        self._pending[guild_id, command] += count
+        self._db.schedule_flush()
+
+    def track(self, command: str, count: int = 1, when: Optional[float] = None) -> None:
+        """Count a command use in the global daily counters; never blocks"""
+        if self._seeded is not None and GLOBAL_SCOPE not in self._seeded:
+            return
+        when = time.time() if when is None else when
+        self._daily[command, int(when // 86400)] += count
+        if when > self._last_used.get(command, 0):
+            self._last_used[command] = when
+        self._db.schedule_flush()
+
+    def track_user(self, user_id: int, command: str, when: Optional[float] = None) -> None:
+        """Count a command use in a user's own history; never blocks"""
+        when = time.time() if when is None else when
+        uses, last_use = self._users.setdefault(user_id, (Counter(), {}))
+        uses[command] += 1
+        if when > last_use.get(command, 0):
+            last_use[command] = when
+        self._db.schedule_flush()
+
+    @staticmethod
+    async def _write_users(users: Dict[int, Tuple[Counter[str], Dict[str, float]]]) -> int:
+        from nexon.data.models import UserData
+
+        rows = await UserData.filter(id__in=list(users))
+        for user in rows:
+            uses, last_use = users[user.id]
+            favorites = dict(user.favorites_commands or {})
+            for command, count in uses.items():
+                favorites[command] = favorites.get(command, 0) + count
+            user.favorites_commands = favorites
+            user.last_command_use = {**(user.last_command_use or {}), **last_use}
+        if rows:
+            await UserData.bulk_update(rows, fields=["favorites_commands", "last_command_use"])
+        if len(rows) < len(users):
+            logger.debug(f"Dropped command usage of {len(users) - len(rows)} unknown users")
+        return len(rows)
+
+    async def _flush_users(self) -> int:
+        if not self._users:
+            return 0
+        # One flush at a time, or two could read the same row before either writes
+        async with self._users_lock:
+            users, self._users = self._users, {}
+            user_ids = list(users)
+            written = 0
+            for start in range(0, len(user_ids), self.USER_BATCH):
+                chunk = user_ids[start:start + self.USER_BATCH]
+                batch = {user_id: users[user_id] for user_id in chunk}
+                try:
+                    written += await self._write_users(batch)
+                except Exception as e:
+                    # Keep the counts for the next flush rather than losing them
+                    for user_id, (uses, last_use) in batch.items():
+                        pending_uses, pending_last = self._users.setdefault(user_id, (Counter(), {}))
+                        pending_uses.update(uses)
+                        for command, when in last_use.items():
+                            pending_last[command] = max(when, pending_last.get(command, 0))
+                    logger.error(f"Failed to flush command usage of {len(batch)} users: {e}")
+            return written
+
+    def _write_sync(
+        self,
+        increments: List[Tuple[int, str, int]],
+        daily: List[Tuple[str, int, int, Optional[float]]],
+    ) -> None:
+        conn = self._db.conn
+        assert conn is not None
+        with conn:
+            conn.executemany(
+                "INSERT INTO guild_command_usage (guild_id, command, uses) VALUES (?, ?, ?) "
+                "ON CONFLICT (guild_id, command) DO UPDATE SET uses = uses + excluded.uses",
+                increments,
+            )
+            conn.executemany(
+                "INSERT INTO command_usage_daily (command, day, uses, last_used) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (command, day) DO UPDATE SET "
+                "uses = uses + excluded.uses, "
+                "last_used = max(coalesce(last_used, 0), excluded.last_used)",
+                daily,
+            )
+
+    async def flush(self) -> int:
+        """Write pending counts; returns how many counters and users were touched"""
+        touched = await self._flush_users()
+        if not (self._pending or self._daily) or not self._db.is_open:
+            return touched
+        pending, self._pending = self._pending, Counter()
+        daily, self._daily = self._daily, Counter()
+        last_used, self._last_used = self._last_used, {}
+        increments = [(guild_id, command, uses) for (guild_id, command), uses in pending.items()]
+        daily_increments = [
+            (command, day, uses, last_used.get(command)) for (command, day), uses in daily.items()
+        ]
+        try:
+            await self._db.run(self._write_sync, increments, daily_increments)
+        except Exception as e:
+            # Keep the counts for the next flush rather than losing them
+            self._pending.update(pending)
+            self._daily.update(daily)
+            for command, when in last_used.items():
+                self._last_used[command] = max(when, self._last_used.get(command, 0))
+            logger.error(f"Failed to flush command usage: {e}")
+            raise
+        return touched + len(increments) + len(daily_increments)
+
+    def _seed_sync(self, guild_id: int, usage: Dict[str, int]) -> None:
+        conn = self._db.conn
+        assert conn is not None
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO guild_command_usage (guild_id, command, uses) "
+                "VALUES (?, ?, ?)",
+                [(guild_id, command, uses) for command, uses in usage.items()],
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO seeded_guilds (guild_id) VALUES (?)", (guild_id,)
+            )
+
+    @staticmethod
+    async def _sum_history(history: Callable[[], Awaitable[Iterable[Dict[str, Any]]]]) -> Dict[str, int]:
+        usage: Counter[str] = Counter()
+        for favorites in await history():
+            usage.update({command: int(uses) for command, uses in (favorites or {}).items()})
+        return dict(usage)
+
+    async def _seed(
+        self, guild_id: int, history: Callable[[], Awaitable[Iterable[Dict[str, Any]]]]
+    ) -> None:
+        usage = await self._sum_history(history)
+        await self._db.run(self._seed_sync, guild_id, usage)
+        assert self._seeded is not None
+        self._seeded.add(guild_id)
+
+    def _read_sync(self, guild_id: int) -> List[Tuple[str, int]]:
+        assert self._db.conn is not None
+        return self._db.conn.execute(
+            "SELECT command, uses FROM guild_command_usage WHERE guild_id = ?", (guild_id,)
+        ).fetchall()
+
+    async def guild_usage(
+        self,
+        guild_id: int,
+        history: Callable[[], Awaitable[Iterable[Dict[str, Any]]]],
+    ) -> Dict[str, int]:
+        """Command -> uses for a guild, backfilled once from ``history`` if needed"""
+        try:
+            await self.open()
+        except Exception as e:
+            logger.warning(f"Command usage store unavailable, summing member history: {e}")
+            return await self._sum_history(history)
+        assert self._seeded is not None
+        if guild_id not in self._seeded:
+            task = self._seeding.get(guild_id)
+            if task is None:
+                task = self._seeding[guild_id] = asyncio.create_task(self._seed(guild_id, history))
+                task.add_done_callback(lambda _: self._seeding.pop(guild_id, None))
+            await asyncio.shield(task)
+
+        usage = dict(await self._db.run(self._read_sync, guild_id))
+        for (pending_guild, command), uses in self._pending.items():
+            if pending_guild == guild_id:
+                usage[command] = usage.get(command, 0) + uses
+        return usage
+
+    def _seed_global_sync(self, usage: Dict[str, int], last_used: Dict[str, float]) -> None:
+        conn = self._db.conn
+        assert conn is not None
+        with conn:
+            # Day 0 holds everything counted before the daily counters existed
+            conn.executemany(
+                "INSERT OR REPLACE INTO command_usage_daily (command, day, uses, last_used) "
+                "VALUES (?, 0, ?, ?)",
+                [(command, uses, last_used.get(command)) for command, uses in usage.items()],
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO seeded_guilds (guild_id) VALUES (?)", (GLOBAL_SCOPE,)
+            )
+
+    @staticmethod
+    async def _sum_global_history(
+        history: Callable[[], Awaitable[Iterable[Tuple[Dict[str, Any], Dict[str, Any]]]]],
+    ) -> Tuple[Dict[str, int], Dict[str, float]]:
+        usage: Counter[str] = Counter()
+        last_used: Dict[str, float] = {}
+        for favorites, last_use in await history():
+            usage.update({command: int(uses) for command, uses in (favorites or {}).items()})
+            for command, when in (last_use or {}).items():
+                if when and float(when) > last_used.get(command, 0):
+                    last_used[command] = float(when)
+        return dict(usage), last_used
+
+    async def _seed_global(
+        self,
+        history: Callable[[], Awaitable[Iterable[Tuple[Dict[str, Any], Dict[str, Any]]]]],
+    ) -> None:
+        usage, last_used = await self._sum_global_history(history)
+        await self._db.run(self._seed_global_sync, usage, last_used)
+        assert self._seeded is not None
+        self._seeded.add(GLOBAL_SCOPE)
+
+    def _stats_sync(self) -> List[Tuple[str, int, Optional[float]]]:
+        assert self._db.conn is not None
+        return self._db.conn.execute(
+            "SELECT command, SUM(uses), MAX(last_used) FROM command_usage_daily GROUP BY command"
+        ).fetchall()
+
+    async def command_stats(
+        self,
+        history: Callable[[], Awaitable[Iterable[Tuple[Dict[str, Any], Dict[str, Any]]]]],
+    ) -> Dict[str, Tuple[int, Optional[float]]]:
+        """Command -> (uses, last used timestamp), backfilled once from ``history``"""
+        try:
+            await self.open()
+        except Exception as e:
+            logger.warning(f"Command usage store unavailable, summing user history: {e}")
+            usage, last_used = await self._sum_global_history(history)
+            return {command: (uses, last_used.get(command)) for command, uses in usage.items()}
+        assert self._seeded is not None
+        if GLOBAL_SCOPE not in self._seeded:
+            task = self._seeding.get(GLOBAL_SCOPE)
+            if task is None:
+                task = self._seeding[GLOBAL_SCOPE] = asyncio.create_task(self._seed_global(history))
+                task.add_done_callback(lambda _: self._seeding.pop(GLOBAL_SCOPE, None))
+            await asyncio.shield(task)
+
+        stats = {command: (uses, last_used) for command, uses, last_used in await self._db.run(self._stats_sync)}
+        for (command, _), uses in self._daily.items():
+            stored_uses, stored_last = stats.get(command, (0, None))
+            stats[command] = (stored_uses + uses, stored_last)
+        for command, when in self._last_used.items():
+            uses, stored_last = stats[command]
+            stats[command] = (uses, max(when, stored_last or 0))
+        return stats
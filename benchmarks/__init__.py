@@ -0,0 +1,4 @@
+"""Micro-benchmarks for the dashboard backend.
+
+Run a benchmark with ``python -m benchmarks.<name>`` from the repository root.
+"""
@@ -0,0 +1,135 @@
+"""Count Discord OAuth calls per dashboard page load.
+
+Replays the requests the dashboard sends when a guild settings page opens:
+the user lookup, the admin check, and the settings page and channel list
+(both behind the get_user dependency, plus a verify_auth in the handler),
+then the server picker's joined-guilds filter as a separate page. Each
+request gets a fresh ``request.state`` like a real HTTP request, and the
+OAuth session's /users/@me and /users/@me/guilds calls are counted instead
+of being sent to Discord. Session token cookies issued along the way are
+kept in a per-user cookie jar, like a browser would; the "expired" run
+clears both the cached lookups and the session token first.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from types import SimpleNamespace
+
+from nexon.OAuth2 import OAuth2Session
+
+from backend.api.v1 import auth, guilds
+from backend.api.v1.baseModels import GuildsRequest
+from backend.apiManager import APIConfig, APIServer
+from backend.features.cache import cache_manager
+from backend.features.security import SessionTokenSigner
+from backend.features.sessions import OAuthSessionStore
+
+GUILD_ID = 1087654321098765432
+USER = {"id": "210987654321098765", "username": "negomi"}
+calls: Counter = Counter()
+
+
+async def fetch_user(self):
+    calls["/users/@me"] += 1
+    return dict(USER)
+
+
+async def fetch_guilds(self):
+    calls["/users/@me/guilds"] += 1
+    return [{"id": str(GUILD_ID), "permissions": "8"}]
+
+
+class FakeBot:
+    """Gateway cache with one guild where the user is an administrator"""
+
+    def __init__(self) -> None:
+        member = SimpleNamespace(guild_permissions=SimpleNamespace(administrator=True))
+        self.guild = SimpleNamespace(id=GUILD_ID, get_member=lambda user_id: member)
+        self.guilds = [self.guild]
+
+    def get_guild(self, guild_id: int):
+        return self.guild if guild_id == GUILD_ID else None
+
+
+def make_backend() -> APIServer:
+    backend = APIServer.__new__(APIServer)
+    backend.logger = logging.getLogger("benchmark")
+    backend.config = APIConfig()
+    backend.client = FakeBot()
+    backend.oauth_client = None
+    backend.oauth_sessions = OAuthSessionStore(None)
+    backend.session_tokens = SessionTokenSigner("benchmark-secret")
+    return backend
+
+
+class Browser:
+    """Cookie jar for one dashboard user"""
+
+    def __init__(self, backend: APIServer, token: str) -> None:
+        self.backend = backend
+        self.cookies = {"accessToken": token}
+
+    def request(self) -> SimpleNamespace:
+        return SimpleNamespace(
+            cookies=dict(self.cookies),
+            state=SimpleNamespace(),
+            app=SimpleNamespace(state=SimpleNamespace(backend=self.backend)),
+        )
+
+    async def send(self, handler, *args) -> None:
+        request = self.request()
+        await handler(request, *args)
+        # What session_token_middleware would set on the response
+        session_token = getattr(request.state, "session_token", None)
+        if session_token:
+            self.cookies["sessionToken"] = session_token
+
+
+async def settings_handler(request, guild_id: int) -> None:
+    # Settings page and channel list: dependency plus handler share a request
+    await guilds.get_user(request, guild_id)
+    await request.app.state.backend.verify_auth(request)
+
+
+async def page_load(browser: Browser) -> None:
+    await browser.send(auth.get_user)
+    await browser.send(lambda request: guilds.is_admin(GUILD_ID, request))
+    for _ in range(2):
+        await browser.send(settings_handler, GUILD_ID)
+
+
+async def server_picker(browser: Browser) -> None:
+    await browser.send(auth.get_user)
+    await browser.send(guilds.filter_joined_guilds, GuildsRequest(guilds=[str(GUILD_ID)]))
+
+
+async def expired_page_load(browser: Browser) -> None:
+    browser.cookies.pop("sessionToken", None)
+    await cache_manager.invalidate_by_tags({"discord"})
+    await page_load(browser)
+
+
+async def main() -> None:
+    OAuth2Session.fetch_user = fetch_user
+    OAuth2Session.fetch_guilds = fetch_guilds
+    backend = make_backend()
+    browser = Browser(backend, "benchmark-token")
+
+    for name, load in (
+        ("settings page, cold", page_load),
+        ("settings page, warm", page_load),
+        ("server picker", server_picker),
+        ("settings page, expired", expired_page_load),
+    ):
+        calls.clear()
+        await load(browser)
+        print(f"{name:<24}: {sum(calls.values())} Discord calls {dict(calls)}")
+
+    calls.clear()
+    await asyncio.gather(*(page_load(Browser(backend, f"token-{i}")) for i in range(50)))
+    print(f"50 concurrent new users: {sum(calls.values()) / 50:.1f} Discord calls per page load")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""Benchmark L1 admission on a replayed dashboard access trace.
+
+The trace mixes the steady per-user OAuth lookups (user and guild list per
+session, Zipf distributed) with the two scans that used to flush them: an
+admin paging through every guild and a /api/cache/warm call. L1 hit rate is
+compared with plain LRU and with TinyLFU admission.
+"""
+
+import random
+import time
+
+from backend.features.cache import CacheEntry, MemoryBackend
+
+SESSIONS = 400
+REQUESTS = 200000
+SCAN_GUILDS = 5000
+SCAN_EVERY = 20000
+ENTRY_BYTES = 2048
+L1_BYTES = 300 * ENTRY_BYTES
+
+
+def build_trace(seed: int = 7) -> list:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(SESSIONS)]
+    sessions = rng.choices(range(SESSIONS), weights=weights, k=REQUESTS)
+    trace = []
+    for i, session in enumerate(sessions):
+        if i and i % SCAN_EVERY == 0:
+            offset = rng.randrange(10 ** 6)
+            trace.extend(f"guild:{offset + g}" for g in range(SCAN_GUILDS))
+        trace.append(f"get_cached_user:{session}")
+        trace.append(f"get_cached_guilds:{session}")
+    return trace
+
+
+def replay(trace: list, admission: bool) -> tuple:
+    backend = MemoryBackend(max_bytes=L1_BYTES)
+    backend.admission_default = admission
+    hits = session_hits = sessions = 0
+    start = time.perf_counter()
+    for key in trace:
+        is_session = not key.startswith("guild:")
+        sessions += is_session
+        if backend.get_nowait(key) is not None:
+            hits += 1
+            session_hits += is_session
+            continue
+        entry = CacheEntry(key=key, value=None, created_at=0.0, size=ENTRY_BYTES)
+        backend.put(key, entry)
+    elapsed = time.perf_counter() - start
+    return hits / len(trace), session_hits / sessions, len(trace) / elapsed, backend.rejections
+
+
+def main() -> None:
+    trace = build_trace()
+    print(f"trace: {len(trace):,} lookups, L1 holds {L1_BYTES // ENTRY_BYTES} entries")
+    for name, admission in (("LRU", False), ("TinyLFU", True)):
+        hit_rate, session_rate, throughput, rejections = replay(trace, admission)
+        print(f"{name:<8} hit rate {hit_rate:6.1%}  session hit rate {session_rate:6.1%}  "
+              f"{throughput:>10,.0f} lookups/s  "
+              f"rejected {rejections:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark CompressedBackend codecs: compression ratio against get/set latency.
+
+Each payload shape is stored with every codec on its own (raw, zlib-1,
+zlib-6, lzma) and with the default size ladder, reporting stored bytes
+relative to the pickled value and per-operation put/get times. The
+"legacy" line is the old scheme: the whole entry pickled, then zlib-6.
+The "cold" line is the ladder's entry after recompress_cold has moved it
+to lzma off the event loop; the backend only does that for entries of
+64 KiB or more, here it is forced for every shape.
+"""
+
+import asyncio
+import pickle
+import time
+import zlib
+
+from backend.features.cache import (
+    CacheEntry, Codec, CompressedBackend, LzmaCodec, ZlibCodec
+)
+
+ROUNDS = 200
+
+
+def payloads() -> dict:
+    guild = lambda i: {
+        "id": str(10 ** 17 + i), "name": f"Guild {i}", "icon": f"a_{i:030x}",
+        "owner": i % 3 == 0, "permissions": str(2147483647 - i),
+        "features": ["COMMUNITY", "NEWS", f"F{i}"],
+    }
+    return {
+        "user (small dict)": {"id": "1087654321098765432", "username": "negomi", "avatar": None},
+        "guild list (medium)": [guild(i) for i in range(40)],
+        "command list (large)": [
+            {"name": f"command{i}", "description": "Does something useful " * 4,
+             "options": [{"name": f"option{j}", "type": 3} for j in range(6)]}
+            for i in range(300)
+        ],
+        "tuple rows": [(i, f"row {i}", i * 0.5) for i in range(500)],
+    }
+
+
+async def measure(backend: CompressedBackend, value: object) -> tuple:
+    entry = CacheEntry(key="k", value=value, created_at=time.time(), tags={"bench"})
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        backend.put("k", entry)
+    put = (time.perf_counter() - start) / ROUNDS
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await backend.get("k")
+    get = (time.perf_counter() - start) / ROUNDS
+    return backend.data["k"], put, get
+
+
+def measure_legacy(value: object) -> tuple:
+    entry = CacheEntry(key="k", value=value, created_at=time.time(), tags={"bench"})
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        stored = zlib.compress(pickle.dumps(entry), 6)
+    put = (time.perf_counter() - start) / ROUNDS
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        pickle.loads(zlib.decompress(stored))
+    get = (time.perf_counter() - start) / ROUNDS
+    return len(stored), put, get
+
+
+async def main() -> None:
+    codecs = {
+        "raw": ((0, Codec()),),
+        "zlib-1": ((0, ZlibCodec(1)),),
+        "zlib-6": ((0, ZlibCodec(6)),),
+        "lzma": ((0, LzmaCodec()),),
+    }
+    for name, value in payloads().items():
+        pickled = len(pickle.dumps(value))
+        print(f"{name}: {pickled:,} bytes pickled")
+        size, put, get = measure_legacy(value)
+        print(f"  {'legacy':<7} {'zlib-6':<7} ratio {size / pickled:6.1%}  "
+              f"put {put * 1e6:8.1f} us  get {get * 1e6:8.1f} us")
+        for codec_name, ladder in (*codecs.items(), ("ladder", None)):
+            backend = CompressedBackend(codecs=ladder) if ladder else CompressedBackend()
+            packed, put, get = await measure(backend, value)
+            print(f"  {codec_name:<7} {packed.codec.name:<7} "
+                  f"ratio {len(packed.payload) / pickled:6.1%}  "
+                  f"put {put * 1e6:8.1f} us  get {get * 1e6:8.1f} us")
+        
+        backend = CompressedBackend(cold_after=0, cold_min_bytes=0)
+        backend.put("k", CacheEntry(key="k", value=value, created_at=time.time()))
+        await backend.recompress_cold()
+        packed = backend.data["k"]
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            await backend.get("k")
+        get = (time.perf_counter() - start) / ROUNDS
+        print(f"  {'cold':<7} {packed.codec.name:<7} ratio {len(packed.payload) / pickled:6.1%}  "
+              f"{'':<16}  get {get * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+"""Benchmark cache key generation for @cached call sites.
+
+Compares the legacy cache_key_generator (str() every argument, hash it,
+then SHA-256 the joined string) with structural_key on the argument shapes
+the dashboard actually uses.
+"""
+
+import timeit
+
+from backend.features.cache import cache_key_generator, structural_key, token_key
+
+NUMBER = 200000
+
+
+class FakeServer:
+    """Stands in for APIServer as a bound-method receiver"""
+
+    def __init__(self) -> None:
+        self.config = {"host": "0.0.0.0", "port": 25400}
+        self.oauth_sessions = {str(i): object() for i in range(50)}
+
+    def __cache_key__(self) -> str:
+        return "APIServer:25400"
+
+
+def main() -> None:
+    server = FakeServer()
+    token = "MTA4NzY1NDMyMTA5ODc2NTQzMg.abcdef.ghijklmnop"
+    cases = {
+        "method(self, int)": (server, 1087654321098765432),
+        "func(backend, token)": (server, token),
+        "func(int, str)": (1087654321098765432, "overview"),
+    }
+
+    for name, args in cases.items():
+        legacy = timeit.timeit(lambda: cache_key_generator(*args), number=NUMBER)
+        structural = timeit.timeit(lambda: f"{structural_key(*args)!r}", number=NUMBER)
+        print(f"{name:<22} legacy {NUMBER / legacy:>12,.0f}/s  "
+              f"structural {NUMBER / structural:>12,.0f}/s ({legacy / structural:.1f}x)")
+
+    explicit = timeit.timeit(lambda: token_key(server, token), number=NUMBER)
+    print(f"{'token_key':<22} {NUMBER / explicit:>12,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark HierarchicalCacheManager.set throughput.
+
+Compares the old eager accounting (pickle twice + SHA-256 on every write)
+with the cheap-write default and with a checksummed namespace.
+"""
+
+import asyncio
+import time
+
+from backend.features.cache import CacheEntry, HierarchicalCacheManager
+
+ITERATIONS = 20000
+
+
+def make_guild(i: int) -> dict:
+    return {
+        "id": str(i),
+        "name": f"Guild {i}",
+        "icon": None,
+        "owner": False,
+        "permissions": "2147483647",
+        "features": ["COMMUNITY", "NEWS", "WELCOME_SCREEN_ENABLED"],
+    }
+
+
+def legacy_entry(key: str, value) -> CacheEntry:
+    """Build an entry the way the old ``__post_init__`` did"""
+    entry = CacheEntry(key=key, value=value, created_at=time.time())
+    entry.size = entry._calculate_size()
+    entry.checksum = entry._calculate_checksum()
+    return entry
+
+
+def bench_entries(values: list) -> None:
+    start = time.perf_counter()
+    for i, value in enumerate(values):
+        legacy_entry(f"k{i}", value)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i, value in enumerate(values):
+        CacheEntry(key=f"k{i}", value=value, created_at=time.time())
+    cheap = time.perf_counter() - start
+
+    print(f"CacheEntry eager : {len(values) / legacy:>12,.0f} entries/s")
+    print(f"CacheEntry cheap : {len(values) / cheap:>12,.0f} entries/s "
+          f"({legacy / cheap:.1f}x)")
+
+
+async def bench_set(values: list, namespace: str, checksummed: bool) -> float:
+    manager = HierarchicalCacheManager()
+    if checksummed:
+        manager.enable_checksums(namespace)
+
+    start = time.perf_counter()
+    for i, value in enumerate(values):
+        await manager.set(f"{namespace}:{i}", value, ttl=60, namespace=namespace)
+    return len(values) / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    values = [[make_guild(i * 100 + j) for j in range(25)] for i in range(ITERATIONS)]
+
+    bench_entries(values)
+    checked = await bench_set(values, "guild", checksummed=True)
+    cheap = await bench_set(values, "guild", checksummed=False)
+    print(f"set() checksummed: {checked:>12,.0f} ops/s")
+    print(f"set() cheap      : {cheap:>12,.0f} ops/s ({cheap / checked:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,171 @@
+"""Benchmark command usage tracking and the /bot/command-stats query.
+
+Tracks 50,000 command uses (Zipf-like over 120 commands, spread over 30
+days) through CommandUsageStore, and through the old per-use read-modify-
+write of a user's JSON usage fields, here on a SQLite table shaped like
+UserData. Then compares reading global stats from the (command, day) table
+against walking every user's JSON, as the endpoint used to.
+
+Finally posts 5,000 of those uses to /bot/track-command itself, against
+nexon's UserData on a SQLite Tortoise database: the old handler's
+get/edit/save per call against the buffered handler plus its flush.
+"""
+
+import asyncio
+import json
+import random
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+
+from nexon.data.models import UserData
+from tortoise import Tortoise
+
+from backend.api.v1 import bot
+from backend.features.usage import CommandUsageStore
+
+USES = 50_000
+ENDPOINT_USES = 5_000
+USERS = 20_000
+COMMANDS = [f"command{i}" for i in range(120)]
+DAYS = 30
+
+
+def build_trace(seed: int = 7) -> list:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(COMMANDS))]
+    now = time.time()
+    return [
+        (rng.randrange(USERS), command, now - rng.random() * DAYS * 86400)
+        for command in rng.choices(COMMANDS, weights, k=USES)
+    ]
+
+
+def legacy_database(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE users (id INTEGER PRIMARY KEY, favorites_commands TEXT, last_command_use TEXT)"
+    )
+    conn.executemany("INSERT INTO users VALUES (?, '{}', '{}')", ((i,) for i in range(USERS)))
+    conn.commit()
+    return conn
+
+
+def legacy_track(conn: sqlite3.Connection, user_id: int, command: str, when: float) -> None:
+    favorites, last_use = conn.execute(
+        "SELECT favorites_commands, last_command_use FROM users WHERE id = ?", (user_id,)
+    ).fetchone()
+    favorites, last_use = json.loads(favorites), json.loads(last_use)
+    favorites[command] = favorites.get(command, 0) + 1
+    last_use[command] = when
+    conn.execute(
+        "UPDATE users SET favorites_commands = ?, last_command_use = ? WHERE id = ?",
+        (json.dumps(favorites), json.dumps(last_use), user_id),
+    )
+    conn.commit()
+
+
+def legacy_stats(conn: sqlite3.Connection) -> Counter:
+    stats: Counter = Counter()
+    for favorites, in conn.execute("SELECT favorites_commands FROM users"):
+        stats.update(json.loads(favorites))
+    return stats
+
+
+async def legacy_track_command(request) -> dict:
+    """/bot/track-command as it was: one read-modify-write per call"""
+    data = await request.json()
+    user = await UserData.get(id=data["user_id"])
+    user.favorites_commands[data["command"]] = user.favorites_commands.get(data["command"], 0) + 1
+    user.last_command_use[data["command"]] = time.time()
+    await user.save()
+    return {"success": True}
+
+
+def make_request(store: CommandUsageStore, user_id: int, command: str) -> SimpleNamespace:
+    body = {"command": command, "user_id": str(user_id)}
+    return SimpleNamespace(
+        json=lambda: asyncio.sleep(0, result=body),
+        app=SimpleNamespace(state=SimpleNamespace(backend=SimpleNamespace(command_usage=store))),
+    )
+
+
+async def bench_endpoint(trace: list, directory: Path) -> tuple:
+    await Tortoise.init(
+        db_url=f"sqlite://{directory / 'users.db'}", modules={"models": ["nexon.data.models"]}
+    )
+    await Tortoise.generate_schemas()
+    await UserData.bulk_create([UserData(id=i) for i in range(USERS)], batch_size=1000)
+    store = CommandUsageStore(directory / "endpoint.db", flush_delay=0.05)
+    await store.open()
+    requests = [make_request(store, user_id, command) for user_id, command, _ in trace[:ENDPOINT_USES]]
+
+    start = time.perf_counter()
+    for request in requests:
+        await legacy_track_command(request)
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for request in requests:
+        await bot.track_command_usage(request)
+    await store.flush()
+    buffered_elapsed = time.perf_counter() - start
+
+    # Both handlers wrote every use once
+    expected = Counter(command for _, command, _ in trace[:ENDPOINT_USES])
+    stored: Counter = Counter()
+    for favorites in await UserData.all().values_list("favorites_commands", flat=True):
+        stored.update(favorites)
+    assert stored == expected + expected
+    await store.close()
+    await Tortoise.close_connections()
+    return legacy_elapsed, buffered_elapsed
+
+
+async def main() -> None:
+    trace = build_trace()
+    directory = Path(tempfile.mkdtemp())
+
+    conn = legacy_database(directory / "legacy.db")
+    start = time.perf_counter()
+    for user_id, command, when in trace:
+        legacy_track(conn, user_id, command, when)
+    legacy_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = legacy_stats(conn)
+    legacy_read = time.perf_counter() - start
+
+    store = CommandUsageStore(directory / "usage.db", flush_delay=0.05)
+    await store.command_stats(lambda: asyncio.sleep(0, result=[]))
+    start = time.perf_counter()
+    for _, command, when in trace:
+        store.track(command, when=when)
+    track_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    rows = await store.flush()
+    flush_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(100):
+        stats = await store.command_stats(lambda: asyncio.sleep(0, result=[]))
+    read = (time.perf_counter() - start) / 100
+    assert {command: uses for command, (uses, _) in stats.items()} == dict(expected)
+    await store.close()
+    endpoint_legacy, endpoint_buffered = await bench_endpoint(trace, directory)
+
+    print(f"{USES:,} tracked uses, {len(COMMANDS)} commands over {DAYS} days, {USERS:,} users")
+    print(f"legacy read-modify-write : {USES / legacy_elapsed:>12,.0f} uses/s")
+    print(f"counter store            : {USES / (track_elapsed + flush_elapsed):>12,.0f} uses/s  "
+          f"(flush of {rows:,} rows took {flush_elapsed * 1e3:.1f} ms)")
+    print(f"command-stats, legacy    : {legacy_read * 1e3:8.2f} ms")
+    print(f"command-stats, counters  : {read * 1e3:8.2f} ms")
+    print(f"track-command, legacy    : {ENDPOINT_USES / endpoint_legacy:>12,.0f} requests/s")
+    print(f"track-command, buffered  : {ENDPOINT_USES / endpoint_buffered:>12,.0f} requests/s  "
+          f"(including the flush)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())